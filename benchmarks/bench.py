@@ -0,0 +1,312 @@
+"""
+Benchmarks over the bundled predicate datasets.
+
+    python benchmarks/bench.py run --sizes 100 1000 --output bench.json
+    python benchmarks/bench.py compare baseline.json bench.json
+
+`run` times the front-end stages and Comparator.compare on single predicates/pairs
+(micro-benchmarks) and scores the first N pairs of datasets/diversified_predicates.csv
+at each requested size (macro runs, each in a fresh process so that peak RSS is per run).
+Startup runs time fresh interpreters importing the package and running the `main.py` CLI,
+which must not load SymPy or Z3 for usage errors and identical predicates.
+Results are written as JSON together with the commit they were measured on; `compare`
+prints the relative change of the headline numbers between two result files.
+"""
+import argparse
+import concurrent.futures
+import csv
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from predi.comparator import Comparator
+from predi.instrumentation import summarize
+from predi.parser import Parser, RecursiveDescentParser
+from predi.simplifier import Simplifier
+from predi.tokenizer import Tokenizer
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+DATASETS = os.path.join(ROOT, 'datasets')
+PAIRS_FILE = os.path.join(DATASETS, 'diversified_predicates.csv')
+
+
+def load_predicates(size: int) -> List[str]:
+    with open(os.path.join(DATASETS, f'predicate_sample_{size}.csv'), newline='') as csvfile:
+        return [row['predicate'] for row in csv.DictReader(csvfile)]
+
+
+def load_pairs(limit: Optional[int] = None, filename: str = PAIRS_FILE) -> List[tuple]:
+    pairs = []
+    with open(filename, newline='') as csvfile:
+        for row in csv.DictReader(csvfile):
+            if limit is not None and len(pairs) >= limit:
+                break
+            pairs.append((row['predicate'], row['diversified_predicate']))
+    return pairs
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def time_calls(function: Callable[[Any], Any], inputs: List[Any], repeat: int = 1) -> Dict[str, Any]:
+    """
+    Time `function` on every input, `repeat` times; inputs that raise are counted as failures.
+    Latencies are reported in seconds.
+    """
+    latencies = []
+    failures = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in inputs:
+            start = time.perf_counter()
+            try:
+                function(item)
+            except Exception:
+                failures += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+    elapsed = time.perf_counter() - started
+    result = summarize(latencies)
+    result.update(failures=failures, elapsed=elapsed, ops_per_sec=len(latencies) / elapsed if elapsed else 0.0)
+    return result
+
+
+def _try(function: Callable[[Any], Any], item: Any) -> Any:
+    try:
+        return function(item)
+    except Exception:
+        return None
+
+
+def micro_benchmarks(size: int, simplify_limit: int, compare_limit: int, repeat: int) -> Dict[str, Any]:
+    tokenizer = Tokenizer()
+    simplifier = Simplifier()
+    predicates = load_predicates(size)
+    token_lists = [tokens for tokens in (_try(tokenizer.tokenize, p) for p in predicates) if tokens is not None]
+    asts = [ast for ast in (_try(lambda tokens: Parser(tokens).parse(), t) for t in token_lists) if ast is not None]
+    # An uncached comparator, so every call pays for the full pipeline
+    comparator = Comparator(cache_size=0)
+    pairs = load_pairs(compare_limit)
+
+    return {
+        'tokenize': time_calls(tokenizer.tokenize, predicates, repeat),
+        'parse': time_calls(lambda tokens: Parser(tokens).parse(), token_lists, repeat),
+        'simplify': time_calls(simplifier.simplify, asts[:simplify_limit]),
+        'compare': time_calls(lambda pair: comparator.compare(*pair), pairs),
+        **parse_depth_benchmarks(repeat),
+    }
+
+
+PARSE_DEPTHS = (10, 100, 1000)
+
+
+def nested_predicates(depth: int) -> Dict[str, str]:
+    """
+    Predicates nested `depth` levels deep: plain parentheses, a long `&&` chain, and the
+    repeated wrapping produced by diversify_predicates.
+    """
+    wrapped = 'a > b'
+    for _ in range(depth):
+        wrapped = f'({wrapped}) && (true)'
+    return {
+        'parens': '(' * depth + 'a > b' + ')' * depth,
+        'chain': ' && '.join(f'x{i} > 0' for i in range(depth)),
+        'wrapped': wrapped,
+    }
+
+
+def parse_depth_benchmarks(repeat: int) -> Dict[str, Any]:
+    """
+    Parser against the reference RecursiveDescentParser on deeply nested predicates; inputs
+    that exceed the recursion limit show up as failures.
+    """
+    tokenizer = Tokenizer()
+    results = {}
+    for depth in PARSE_DEPTHS:
+        for shape, predicate in nested_predicates(depth).items():
+            tokens = tokenizer.tokenize(predicate)
+            for name, parser_class in (('iterative', Parser), ('recursive', RecursiveDescentParser)):
+                results[f'{name}_{shape}_{depth}'] = time_calls(lambda t: parser_class(t).parse(), [tokens], repeat)
+    return results
+
+
+def simplification_run(limit: int, level: str) -> Dict[str, Any]:
+    pairs = load_pairs(limit)
+    comparator = Comparator(simplification=level)
+    verdicts: List[Optional[str]] = [None] * len(pairs)
+    fast_paths: List[Optional[str]] = [None] * len(pairs)
+
+    def compare_pair(index):
+        verdicts[index] = comparator.compare(*pairs[index])
+        fast_paths[index] = comparator.last_fast_path
+
+    result = time_calls(compare_pair, list(range(len(pairs))))
+    result['verdicts'], result['fast_paths'] = verdicts, fast_paths
+    return result
+
+
+def simplification_benchmarks(limit: int) -> Dict[str, Any]:
+    """
+    Time the comparison of the first `limit` pairs at every simplification level, each in a
+    fresh process so that no level runs on caches warmed by another, and report the share of
+    the pairs that reach the implication checks (rather than being decided by a fast path) on
+    which each level reaches the same verdict as `full`.
+    """
+    runs = {}
+    context = multiprocessing.get_context('spawn')
+    for level in reversed(Comparator.simplification_levels):
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            runs[level] = executor.submit(simplification_run, limit, level).result()
+    reference = runs['full']['verdicts']
+    checked = [index for index, fast_path in enumerate(runs['full']['fast_paths']) if fast_path is None]
+    results = {}
+    for level, run in runs.items():
+        verdicts = run.pop('verdicts')
+        run.pop('fast_paths')
+        agreeing = sum(verdicts[index] == reference[index] for index in checked)
+        results[level] = dict(run, agreement=agreeing / len(checked) if checked else 1.0, compared=len(checked))
+        print(f"simplification {level}: {results[level]['ops_per_sec']:.2f} pairs/sec, "
+              f"{results[level]['agreement']:.1%} agreement with full on {len(checked)} checked pairs", file=sys.stderr)
+    return results
+
+
+def macro_run(size: int, backend: str, simplification: str = 'logic') -> Dict[str, Any]:
+    pairs = load_pairs(size)
+    comparator = Comparator(backend=backend, simplification=simplification)
+    result = time_calls(lambda pair: comparator.compare(*pair), pairs)
+    result['pairs_per_sec'] = result.pop('ops_per_sec')
+    result['peak_rss_mb'] = peak_rss_mb()
+    result['cache'] = comparator.cache.stats()
+    return result
+
+
+def macro_benchmarks(sizes: List[int], backend: str, simplification: str = 'logic') -> Dict[str, Any]:
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for size in sizes:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[str(size)] = executor.submit(macro_run, size, backend, simplification).result()
+        print(f"macro {size}: {results[str(size)]['pairs_per_sec']:.2f} pairs/sec", file=sys.stderr)
+    return results
+
+
+# Fresh-interpreter runs timed by the startup benchmark
+STARTUP_COMMANDS = {
+    'import': ['-c', 'import predi.comparator'],
+    'cli_usage': ['main.py'],
+    'cli_identical': ['main.py', 'a > b', 'a>b'],
+    'cli_compare': ['main.py', 'a > b', 'a >= b'],
+}
+
+
+def startup_benchmarks(repeat: int) -> Dict[str, Any]:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.path.join(ROOT, 'src'), os.environ.get('PYTHONPATH')])))
+
+    def launch(args):
+        subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True, check=True)
+
+    return {name: time_calls(launch, [args], repeat) for name, args in STARTUP_COMMANDS.items()}
+
+
+def metadata() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'commit': commit or None,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run(args) -> None:
+    results = {'meta': metadata()}
+    if not args.skip_micro:
+        results['micro'] = micro_benchmarks(args.micro_size, args.simplify_limit, args.compare_limit, args.repeat)
+    if not args.skip_startup:
+        results['startup'] = startup_benchmarks(args.repeat)
+    if args.simplification_limit:
+        results['simplification'] = simplification_benchmarks(args.simplification_limit)
+    if args.sizes:
+        results['macro'] = macro_benchmarks(args.sizes, args.backend, args.simplification)
+    results['meta']['backend'] = args.backend
+    results['meta']['simplification'] = args.simplification
+    with open(args.output, 'w') as json_file:
+        json.dump(results, json_file, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+
+# (section, metric, higher is better) of the numbers `compare` reports
+HEADLINE_METRICS = [('micro', 'ops_per_sec', True), ('micro', 'p50', False), ('micro', 'p95', False),
+                    ('startup', 'p50', False),
+                    ('simplification', 'ops_per_sec', True), ('simplification', 'agreement', True),
+                    ('macro', 'pairs_per_sec', True), ('macro', 'p95', False), ('macro', 'peak_rss_mb', False)]
+
+
+def compare(args) -> None:
+    with open(args.baseline) as baseline_file, open(args.candidate) as candidate_file:
+        baseline, candidate = json.load(baseline_file), json.load(candidate_file)
+    print(f"baseline {baseline['meta'].get('commit')} vs candidate {candidate['meta'].get('commit')}")
+    for section, metric, higher_is_better in HEADLINE_METRICS:
+        for name, result in candidate.get(section, {}).items():
+            old = baseline.get(section, {}).get(name, {}).get(metric)
+            new = result.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            better = change > 0 if higher_is_better else change < 0
+            print(f"{section:7} {name:22} {metric:14} {old:14.6g} -> {new:14.6g} {change:+8.1%} {'better' if better else 'worse' if change else ''}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description='PreDi benchmarks over the bundled datasets.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the benchmarks and write a JSON result file')
+    run_parser.add_argument('--output', default='bench.json', help='result file (default: bench.json)')
+    run_parser.add_argument('--sizes', type=int, nargs='*', default=[100, 1000, 10000], help='macro run sizes, in pairs')
+    run_parser.add_argument('--backend', default='sympy', choices=Comparator.backends)
+    run_parser.add_argument('--simplification', default='logic', choices=Comparator.simplification_levels,
+                            help='simplification level of the macro runs (default: logic)')
+    run_parser.add_argument('--simplification-limit', type=int, default=200,
+                            help='pairs compared at every simplification level (0 to skip)')
+    run_parser.add_argument('--micro-size', type=int, default=1000, choices=(100, 1000, 10000), help='predicate sample used by the micro-benchmarks')
+    run_parser.add_argument('--simplify-limit', type=int, default=200, help='ASTs timed by the simplify micro-benchmark')
+    run_parser.add_argument('--compare-limit', type=int, default=50, help='pairs timed by the compare micro-benchmark')
+    run_parser.add_argument('--repeat', type=int, default=3, help='repetitions of the tokenize/parse micro-benchmarks')
+    run_parser.add_argument('--skip-micro', action='store_true')
+    run_parser.add_argument('--skip-startup', action='store_true')
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser('compare', help='compare two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,8 +2,14 @@ import sys
 from src.predi.comparator import Comparator
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        from src.predi.server import main as serve
+        serve(sys.argv[2:])
+        return
+
     if len(sys.argv) != 3:
         print("Usage: python main.py <predicate1> <predicate2>")
+        print("       python main.py serve [--socket PATH] [--workers N]")
         return
 
     predicate1 = sys.argv[1]
@@ -13,8 +13,10 @@ setup(
     package_dir={'': 'src'},
     install_requires=[
         'sympy>=1.13.0rc2',
+        'numpy>=1.21',
         'colorama>=0.4.6',
-        'pyyaml>=6.0.1'
+        'pyyaml>=6.0.1',
+        'z3-solver>=4.12'
     ],
     classifiers=[
         'Programming Language :: Python :: 3',
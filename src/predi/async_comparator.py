@@ -0,0 +1,129 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Iterable, Optional, Tuple, Union
+from predi.comparator import Comparator, ComparisonResult, TIMEOUT_VERDICT
+
+
+# Extra time given to the comparator to return its own (possibly fallback) verdict before a
+# per-call timeout is enforced from the event loop
+TIMEOUT_GRACE = 0.1
+
+# Comparators of the executor threads (or of the main thread of each executor process)
+_local = threading.local()
+
+
+def _compare_in_executor(comparator_class, options, predicate1: str, predicate2: str,
+                         timeout: Optional[float]) -> str:
+    comparator = getattr(_local, 'comparator', None)
+    if comparator is None or comparator.options != options:
+        comparator = _local.comparator = comparator_class(**options)
+    return comparator.compare(predicate1, predicate2, timeout=timeout)
+
+
+class AsyncComparator:
+    """
+    Comparator for asyncio programs.
+
+    The comparisons run in an executor, so awaiting them never blocks the event loop: with
+    `executor='thread'` on a thread pool (the loop stays responsive, but SymPy holds the GIL,
+    so comparisons do not run in parallel), with `executor='process'` on a process pool, or
+    on any given Executor. Every executor thread or process keeps its own Comparator, built
+    from the options of `comparator`. At most `max_in_flight` comparisons are submitted at a
+    time (by default `max_workers`, itself one per core; required with a given Executor);
+    further calls wait for a slot.
+    """
+    def __init__(self, comparator: Optional[Comparator] = None, executor: Union[str, Executor] = 'thread',
+                 max_workers: Optional[int] = None, max_in_flight: Optional[int] = None):
+        comparator = comparator if comparator is not None else Comparator()
+        self.comparator_class = type(comparator)
+        self.options = comparator.options
+        self._owns_executor = isinstance(executor, str)
+        if self._owns_executor:
+            max_workers = max_workers or os.cpu_count() or 1
+            if executor == 'thread':
+                executor = ThreadPoolExecutor(max_workers)
+            elif executor == 'process':
+                executor = ProcessPoolExecutor(max_workers)
+            else:
+                raise ValueError(f"Unknown executor: {executor}, expected 'thread', 'process' or an Executor")
+        elif max_in_flight is None:
+            raise ValueError("max_in_flight is required with a given Executor, whose number of workers is not known")
+        self.executor = executor
+        self.max_in_flight = max_in_flight or max_workers
+        # Created on first use, inside the running event loop
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def compare(self, predicate1: str, predicate2: str, timeout: Optional[float] = None) -> str:
+        """
+        Compare two predicates in the executor. `timeout` (or the comparator's default) is the
+        time budget of the comparison; if the executor does not answer within it, for instance
+        because a thread cannot be interrupted, TIMEOUT_VERDICT is returned without waiting.
+        Cancelling the call withdraws the comparison if it has not started yet.
+        """
+        timeout = self.options['timeout'] if timeout is None else timeout
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        loop = asyncio.get_running_loop()
+
+        await self._slots.acquire()
+        try:
+            future = self.executor.submit(_compare_in_executor, self.comparator_class, self.options,
+                                          predicate1, predicate2, timeout)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the work itself is done, even if the caller stops waiting
+        future.add_done_callback(lambda _: self._release(loop))
+
+        result = asyncio.wrap_future(future)
+        if timeout is None:
+            return await result
+        try:
+            return await asyncio.wait_for(result, timeout + TIMEOUT_GRACE)
+        except asyncio.TimeoutError:
+            return TIMEOUT_VERDICT
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            loop.call_soon_threadsafe(self._slots.release)
+        except RuntimeError:
+            # The event loop was closed while the comparison was still running
+            pass
+
+    async def compare_many(self, pairs: Iterable[Tuple[str, str]], ordered: bool = True,
+                           timeout: Optional[float] = None) -> AsyncIterator[ComparisonResult]:
+        """
+        Compare many predicate pairs concurrently, yielding results in input order (or, without
+        `ordered`, in completion order). An exception raised while comparing a pair is reported
+        in that pair's `error` field and does not stop the batch.
+        """
+        async def compare_pair(index: int, predicate1: str, predicate2: str) -> ComparisonResult:
+            try:
+                verdict = await self.compare(predicate1, predicate2, timeout)
+                return ComparisonResult(index, predicate1, predicate2, verdict)
+            except Exception as e:
+                return ComparisonResult(index, predicate1, predicate2, None, f"{type(e).__name__}: {e}")
+
+        tasks = [asyncio.ensure_future(compare_pair(index, *pair)) for index, pair in enumerate(pairs)]
+        try:
+            if ordered:
+                for task in tasks:
+                    yield await task
+            else:
+                for task in asyncio.as_completed(tasks):
+                    yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def close(self) -> None:
+        if self._owns_executor:
+            self.executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
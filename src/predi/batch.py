@@ -0,0 +1,92 @@
+import argparse
+import csv
+import sys
+from typing import Iterator, Optional, Tuple
+from predi.comparator import Comparator
+from predi.dedup import compare_deduplicated
+from predi.results import ResultWriter
+from predi.verdict_store import VerdictStore, comparison_version
+
+
+RESULT_FIELDS = ['index', 'predicate', 'diversified_predicate', 'result', 'error']
+
+
+def load_pairs(input_file: str, first_column: str = 'predicate',
+               second_column: str = 'diversified_predicate') -> Iterator[Tuple[str, str]]:
+    """
+    Lazily read predicate pairs from a CSV file such as datasets/diversified_predicates.csv
+    """
+    with open(input_file, 'r', newline='') as csvfile:
+        reader = csv.DictReader(csvfile)
+        for row in reader:
+            yield row[first_column], row[second_column]
+
+
+def compare_csv(input_file: str, output_file: Optional[str] = None, workers: Optional[int] = None,
+                chunksize: int = 16, comparator: Optional[Comparator] = None, dedup: bool = False,
+                store: Optional[str] = None, verdict_store: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Compare every pair of a CSV file across a process pool and stream the verdicts, in input
+    order, to `output_file` (or stdout). With `dedup`, pairs equal up to canonical form are
+    solved once (see `predi.dedup`). With `store`, the results are (also) written to a
+    columnar result store (see `predi.results`), and CSV is only written to `output_file`.
+    With `verdict_store`, the path of an SQLite verdict store (see `predi.verdict_store`),
+    pairs are deduplicated and verdicts are reused across runs. Returns the number of successes and failures.
+    """
+    comparator = comparator if comparator is not None else Comparator()
+    pairs = load_pairs(input_file)
+    verdicts = VerdictStore(verdict_store, comparison_version(comparator)) if verdict_store else None
+    if dedup or verdicts is not None:
+        results = compare_deduplicated(pairs, comparator, workers=workers, chunksize=chunksize, store=verdicts)
+    else:
+        results = comparator.compare_many(pairs, workers=workers, chunksize=chunksize)
+    successes = failures = 0
+    write_csv = output_file or store is None
+    csvfile = (open(output_file, 'w', newline='') if output_file else sys.stdout) if write_csv else None
+    store_writer = ResultWriter(store) if store else None
+    try:
+        if write_csv:
+            writer = csv.writer(csvfile)
+            writer.writerow(RESULT_FIELDS)
+        for result in results:
+            if write_csv:
+                writer.writerow([result.index, result.predicate1, result.predicate2, result.verdict or '', result.error or ''])
+            if store_writer is not None:
+                store_writer.write(result)
+            if result.error is None:
+                successes += 1
+            else:
+                failures += 1
+    finally:
+        if output_file:
+            csvfile.close()
+        if store_writer is not None:
+            store_writer.close()
+        if verdicts is not None:
+            verdicts.close()
+    return successes, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare the predicate pairs of a CSV file in parallel.')
+    parser.add_argument('input_file', help='CSV file with `predicate` and `diversified_predicate` columns')
+    parser.add_argument('-o', '--output', help='CSV file to write the verdicts to (default: stdout)')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes (default: one per core)')
+    parser.add_argument('-c', '--chunksize', type=int, default=16, help='pairs handed to a worker at a time')
+    parser.add_argument('-t', '--timeout', type=float, default=None, help='time budget of each comparison, in seconds')
+    parser.add_argument('-d', '--dedup', action='store_true', help='solve pairs that are equal up to canonical form once')
+    parser.add_argument('-s', '--store', help='directory to write a columnar result store to')
+    parser.add_argument('-v', '--verdict-store', help='SQLite file of verdicts reused across runs (implies --dedup)')
+    parser.add_argument('--simplification', default='logic', choices=Comparator.simplification_levels,
+                        help='how thoroughly predicates are simplified (default: logic)')
+    args = parser.parse_args(argv)
+
+    comparator = Comparator(timeout=args.timeout, simplification=args.simplification)
+    successes, failures = compare_csv(args.input_file, args.output, args.workers, args.chunksize, comparator, args.dedup,
+                                      args.store, args.verdict_store)
+    print(f"Total successes: {successes}", file=sys.stderr)
+    print(f"Total failures: {failures}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,77 +1,478 @@
-import sympy as sp
-from sympy.logic.boolalg import And, Or, Not
-from sympy.logic.inference import satisfiable
+import multiprocessing
+import re
+import time
+from collections import Counter
+from enum import IntEnum
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 from predi.tokenizer import Tokenizer
-from predi.parser import Parser
-from predi.simplifier import Simplifier
-#from predi.config import debug_print
-from src.predi.utils import printer
-import z3
+from predi.parser import ASTNode, Parser
+from predi.cache import LRUCache
+from predi.config import get_tracer
+from predi.instrumentation import Instrumentation, NullInstrumentation
+from predi.deadline import ComparisonTimeout, Deadline, remaining_ms
+from predi.lazy import lazy_import
+from predi.syntactic import canonical, may_imply, signature
+
+# SymPy and Z3 take over a second to import; they are loaded on the first comparison that
+# needs them, so usage errors and syntactically identical predicates never pay for them
+sp = lazy_import('sympy')
+inference = lazy_import('sympy.logic.inference')
+
+
+trace = get_tracer('comparator')
+
+SEPARATOR = '\n' + '=' * 140 + '\n'
+
+FIRST_STRONGER_VERDICT = "The first predicate is stronger."
+SECOND_STRONGER_VERDICT = "The second predicate is stronger."
+EQUIVALENT_VERDICT = "The predicates are equivalent."
+INCOMPARABLE_VERDICT = "The predicates are not equivalent and neither is stronger."
+TIMEOUT_VERDICT = "The comparison timed out; the relation between the predicates is unknown."
+
+
+class Verdict(IntEnum):
+    """
+    Compact code of a verdict, for storing results; ERROR stands for no verdict.
+    """
+    ERROR = 0
+    FIRST_STRONGER = 1
+    SECOND_STRONGER = 2
+    EQUIVALENT = 3
+    INCOMPARABLE = 4
+    TIMEOUT = 5
+
+    @property
+    def text(self) -> Optional[str]:
+        return VERDICT_TEXTS[self]
+
+    @classmethod
+    def of(cls, verdict: Optional[str]) -> 'Verdict':
+        try:
+            return _VERDICT_CODES[verdict]
+        except KeyError:
+            raise ValueError(f"Unknown verdict: {verdict!r}") from None
 
 
-class Comparator:
-    def __init__(self):
-        self.tokenizer = Tokenizer()
-        self.simplifier = Simplifier()
+VERDICT_TEXTS = {
+    Verdict.ERROR: None,
+    Verdict.FIRST_STRONGER: FIRST_STRONGER_VERDICT,
+    Verdict.SECOND_STRONGER: SECOND_STRONGER_VERDICT,
+    Verdict.EQUIVALENT: EQUIVALENT_VERDICT,
+    Verdict.INCOMPARABLE: INCOMPARABLE_VERDICT,
+    Verdict.TIMEOUT: TIMEOUT_VERDICT,
+}
+_VERDICT_CODES = {text: code for code, text in VERDICT_TEXTS.items()}
+
+# Syntactic fast paths of `Comparator.classify`, in the order they are tried
+FAST_PATHS = ('identical_text', 'identical_tokens', 'canonical_ast', 'disjoint')
+
+# Share of a comparison's time budget held back for the Z3 fallback tier
+FALLBACK_SHARE = 0.25
+
+
+class ComparisonResult(NamedTuple):
+    index: int
+    predicate1: str
+    predicate2: str
+    verdict: Optional[str]
+    error: Optional[str] = None
+    # Pair profile of an instrumented comparator
+    profile: Optional[dict] = None
+    # Counterexamples found by the refuter, by implication direction
+    counterexamples: Optional[dict] = None
+    # Wall time of the comparison, and the syntactic fast path that decided it, if any
+    seconds: Optional[float] = None
+    fast_path: Optional[str] = None
 
-    def compare(self, predicate1: str, predicate2: str) -> str:
-        # Tokenize, parse, and simplify the first predicate
-        tokens1 = self.tokenizer.tokenize(predicate1)
-        printer(f"Tokens1: {tokens1}")
-        parser1 = Parser(tokens1)
-        ast1 = parser1.parse()
-        printer(f"Parsed AST1: {ast1}")
 
-        # Tokenize, parse, and simplify the second predicate
-        tokens2 = self.tokenizer.tokenize(predicate2)
-        printer(f"Tokens2: {tokens2}")
-        parser2 = Parser(tokens2)
-        ast2 = parser2.parse()
-        printer(f"Parsed AST2: {ast2}")
+# Backend-specific form of a parsed predicate: for the `sympy` backend `expr` and `simplified`
+# are SymPy expressions, for the `z3` backend `expr` is the Z3 term and `simplified` is None
+class PreparedPredicate(NamedTuple):
+    tokens: List[Tuple[str, str]]
+    ast: ASTNode
+    expr: Any
+    simplified: Any
 
-        # Convert ASTs to SymPy expressions
-        expr1 = self._to_sympy_expr(ast1)
-        expr2 = self._to_sympy_expr(ast2)
 
-        printer(f'> expr1: {expr1}')
-        printer(f'> expr2: {expr2}')
+# Comparator owned by each worker process of Comparator.compare_many
+_worker_comparator = None
 
-        # Simplify expressions
-        simplified_expr1 = sp.simplify(expr1)
-        printer(f"Simplified SymPy Expression 1: {simplified_expr1}")
 
-        simplified_expr2 = sp.simplify(expr2)
-        printer(f"Simplified SymPy Expression 2: {simplified_expr2}")
+def _init_worker(comparator_class, options):
+    global _worker_comparator
+    _worker_comparator = comparator_class(**options)
+
+
+def _compare_in_worker(item: Tuple[int, Tuple[str, str]]) -> ComparisonResult:
+    return _worker_comparator._compare_isolated(item)
+
+
+class Comparator:
+    # Whitespace that separates two word characters ("1 days" vs "1days"), operator characters
+    # ("= =" vs "=="), or a dot ("1 . 5" vs "1.5"), or that sits inside a string literal, is
+    # significant to the tokenizer, so such predicates are not normalized for caching
+    _significant_whitespace = re.compile(r'\w\s+\w|[!=<>&|]\s+[=&|]|\s\.|\.\s|"')
+
+    backends = ('sympy', 'z3')
+    # Simplification levels of the `sympy` backend (see `Simplifier.simplify_expr`)
+    simplification_levels = ('none', 'structural', 'logic', 'full')
+
+    def __init__(self, cache_size: int = 1024, backend: str = 'sympy', instrument: bool = False,
+                 timeout: Optional[float] = None, fast_paths: bool = True, refute: bool = True,
+                 simplification: str = 'logic'):
+        if backend not in self.backends:
+            raise ValueError(f"Unknown backend: {backend}, expected one of {self.backends}")
+        if simplification not in self.simplification_levels:
+            raise ValueError(f"Unknown simplification level: {simplification}, "
+                             f"expected one of {self.simplification_levels}")
+        self.tokenizer = Tokenizer()
+        self.cache = LRUCache(cache_size)
+        self.backend = backend
+        self.instrumentation = Instrumentation() if instrument else NullInstrumentation()
+        # Default time budget of a comparison, in seconds
+        self.timeout = timeout
+        # Whether pairs are first classified syntactically, and how often each fast path decided one
+        self.fast_paths = fast_paths
+        self.fast_path_counts = Counter()
+        # Fast path that decided the last comparison, if any
+        self.last_fast_path: Optional[str] = None
+        # Whether implications are first attacked by random evaluation (`sympy` backend only)
+        self.refute = refute
+        # Counterexamples the refuter found in the last comparison, by direction ('1->2', '2->1')
+        self.last_counterexamples: Dict[str, Dict[str, int]] = {}
+        self.simplification = simplification
+        # Constructor arguments, replayed to build the comparators of worker processes
+        self.options = {'cache_size': cache_size, 'backend': backend, 'instrument': instrument, 'timeout': timeout,
+                        'fast_paths': fast_paths, 'refute': refute, 'simplification': simplification}
+        # Z3 solver shared by the SMT fallbacks of one comparison, created on first use
+        self._implication_solver = None
+        # Deadline of the comparison in progress, if it has a time budget
+        self._deadline = None
+        # Backend of the Z3 fallback tier of deadline-bounded comparisons, created on first use
+        self._fallback_backend = None
+        # Created on first use, as they import SymPy, Z3 or NumPy
+        self._simplifier = None
+        self._z3_backend = None
+        self._refuter = None
+        # SymPy-to-Z3 translation context, kept for the comparator's lifetime
+        self._translator = None
+
+    @property
+    def simplifier(self):
+        if self._simplifier is None:
+            from predi.simplifier import Simplifier
+            self._simplifier = Simplifier()
+        return self._simplifier
+
+    @property
+    def refuter(self):
+        if self._refuter is None:
+            from predi.refuter import Refuter
+            self._refuter = Refuter()
+        return self._refuter
+
+    @property
+    def translator(self):
+        if self._translator is None:
+            from predi.z3_backend import SympyToZ3
+            self._translator = SympyToZ3()
+        return self._translator
+
+    @property
+    def z3_backend(self):
+        if self._z3_backend is None and self.backend == 'z3':
+            from predi.z3_backend import Z3Backend
+            self._z3_backend = Z3Backend()
+        return self._z3_backend
+
+    def compare(self, predicate1: str, predicate2: str, timeout: Optional[float] = None) -> str:
+        """
+        Compare two predicates. Pairs that a syntactic fast path can decide (see `classify`)
+        are answered without a solver, and equivalent ones without loading SymPy or Z3. With a time budget (`timeout` seconds, or the comparator's default)
+        the comparison degrades through cheaper tiers instead of running unbounded: the regular
+        pipeline gets most of the budget, and if
+        it runs out the predicates are decided by Z3 alone within the rest of the budget; when
+        that does not finish either, TIMEOUT_VERDICT is returned.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        self.last_counterexamples = {}
+        self.last_fast_path = None
+        with self.instrumentation.pair():
+            # Syntactic tier: some pairs need no solver at all
+            disjoint = False
+            if self.fast_paths:
+                fast_path, verdict = self._classify(predicate1, predicate2)
+                # A disjoint pair still has to be confirmed on the simplified predicates
+                disjoint = fast_path == 'disjoint'
+                if verdict is not None and not disjoint:
+                    self._took_fast_path(fast_path)
+                    return verdict
+            if timeout is None:
+                return self._compare(predicate1, predicate2, disjoint)
+            return self._compare_with_deadline(predicate1, predicate2, timeout, disjoint)
+
+    def _took_fast_path(self, fast_path: str) -> None:
+        self.instrumentation.branch(f'fast_{fast_path}')
+        self.fast_path_counts[fast_path] += 1
+        self.last_fast_path = fast_path
+
+    def classify(self, predicate1: str, predicate2: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Try to decide a pair syntactically. Returns the name of the fast path that decided it and
+        the verdict, or `(None, None)`. Pairs are equivalent if their normalized text
+        (`identical_text`), their token streams (`identical_tokens`) or their ASTs up to operand
+        order and mirrored relations (`canonical_ast`) are equal, and incomparable if their
+        signatures rule out both implications (`disjoint`, e.g. no shared variables) and neither
+        simplifies to `true` or `false` (a tautology is implied by anything, a contradiction
+        implies anything). Predicates that do not parse are left to the regular pipeline.
+        """
+        fast_path, verdict = self._classify(predicate1, predicate2)
+        if fast_path == 'disjoint' and not self._disjoint(self.prepare(predicate1), self.prepare(predicate2)):
+            return None, None
+        return fast_path, verdict
+
+    def _classify(self, predicate1: str, predicate2: str) -> Tuple[Optional[str], Optional[str]]:
+        # The syntactic checks of `classify`, without confirming a `disjoint` pair
+        if self._cache_key(predicate1) == self._cache_key(predicate2):
+            return 'identical_text', EQUIVALENT_VERDICT
+        with self.instrumentation.stage('fast_path'):
+            try:
+                tokens1 = self.tokenizer.tokenize(predicate1)
+                tokens2 = self.tokenizer.tokenize(predicate2)
+                if tokens1 == tokens2:
+                    return 'identical_tokens', EQUIVALENT_VERDICT
+                ast1 = Parser(tokens1).parse()
+                ast2 = Parser(tokens2).parse()
+            except ValueError:
+                return None, None
+            if canonical(ast1) is canonical(ast2):
+                return 'canonical_ast', EQUIVALENT_VERDICT
+            signature1, signature2 = signature(ast1), signature(ast2)
+            if not may_imply(signature1, signature2) and not may_imply(signature2, signature1):
+                return 'disjoint', INCOMPARABLE_VERDICT
+        return None, None
+
+    def _compare_with_deadline(self, predicate1: str, predicate2: str, timeout: float, disjoint: bool = False) -> str:
+        instrumentation = self.instrumentation
+
+        self._deadline = Deadline(timeout * (1 - FALLBACK_SHARE))
+        try:
+            with self._deadline.enforce():
+                return self._compare(predicate1, predicate2, disjoint)
+        except ComparisonTimeout as e:
+            trace.debug("%s; falling back to Z3", e)
+            instrumentation.count('timeouts')
+        finally:
+            self._deadline = None
+
+        # Z3 tier: lower the ASTs straight to Z3 and bound the queries by the remaining budget
+        instrumentation.branch('z3_fallback')
+        if self._fallback_backend is None:
+            from predi.z3_backend import Z3Backend
+            # Same semantics as the regular pipeline, so that a verdict does not depend on
+            # whether the deadline fired: SymPy reasons over unconstrained reals, the `z3`
+            # backend over non-negative values
+            self._fallback_backend = self.z3_backend or Z3Backend(unsigned=False)
+        deadline = Deadline(timeout * FALLBACK_SHARE)
+        try:
+            with instrumentation.stage('z3_fallback'):
+                terms = [self._fallback_backend.lower(Parser(self.tokenizer.tokenize(predicate)).parse())
+                         for predicate in (predicate1, predicate2)]
+                deadline.check()
+                return self._verdict(*self._fallback_backend.implications(*terms, timeout=deadline.remaining_ms()))
+        except ComparisonTimeout:
+            instrumentation.count('unknown')
+            return TIMEOUT_VERDICT
+
+    def _compare(self, predicate1: str, predicate2: str, disjoint: bool = False) -> str:
+        instrumentation = self.instrumentation
+
+        # Tokenize, parse, and simplify both predicates (or fetch them from the cache)
+        prepared1 = self.prepare(predicate1)
+        prepared2 = self.prepare(predicate2)
+
+        # Pairs with disjoint signatures are incomparable unless a side is a tautology or a contradiction
+        if disjoint and self._disjoint(prepared1, prepared2):
+            self._took_fast_path('disjoint')
+            return INCOMPARABLE_VERDICT
+
+        if self.backend == 'z3':
+            with instrumentation.stage('z3_check'):
+                implies1_to_2, implies2_to_1 = self.z3_backend.implications(prepared1.expr, prepared2.expr,
+                                                                            timeout=remaining_ms(self._deadline))
+            return self._verdict(implies1_to_2, implies2_to_1)
+
+        simplified_expr1 = prepared1.simplified
+        simplified_expr2 = prepared2.simplified
+        self._implication_solver = None
 
         # separate well with a print
-        printer('\n' + '=' * 140 + '\n')
+        trace.debug(SEPARATOR)
 
-        # Manually check implications
-        implies1_to_2 = self._implies(simplified_expr1, simplified_expr2)
-        printer(f"> Implies expr1 to expr2: {implies1_to_2}")
+        # Manually check implications, unless random evaluation finds a counterexample first
+        implies1_to_2 = self._refuted('1->2', simplified_expr1, simplified_expr2)
+        if implies1_to_2 is None:
+            with instrumentation.stage('implies'):
+                implies1_to_2 = self._implies(simplified_expr1, simplified_expr2)
+        trace.debug("> Implies expr1 to expr2: %s", implies1_to_2)
 
         # separate well with a print
-        printer('\n' + '=' * 140 + '\n')
+        trace.debug(SEPARATOR)
 
-        implies2_to_1 = self._implies(simplified_expr2, simplified_expr1)
-        printer(f"> Implies expr2 to expr1: {implies2_to_1}")
+        implies2_to_1 = self._refuted('2->1', simplified_expr2, simplified_expr1)
+        if implies2_to_1 is None:
+            with instrumentation.stage('implies'):
+                implies2_to_1 = self._implies(simplified_expr2, simplified_expr1)
+        trace.debug("> Implies expr2 to expr1: %s", implies2_to_1)
 
 
         # separate well with a print
-        printer('\n' + '=' * 140 + '\n')
-
+        trace.debug(SEPARATOR)
 
+        return self._verdict(implies1_to_2, implies2_to_1)
 
+    def _refuted(self, direction: str, premise, conclusion) -> Optional[bool]:
+        """
+        False if the refuter finds an assignment under which `premise` holds and `conclusion`
+        does not, None if the implication still has to be decided.
+        """
+        if not self.refute:
+            return None
+        if self._deadline is not None:
+            self._deadline.check()
+        with self.instrumentation.stage('refute'):
+            counterexample = self.refuter.refute(premise, conclusion)
+        if counterexample is None:
+            return None
+        trace.debug("Counterexample to %s -> %s: %s", premise, conclusion, counterexample)
+        self.instrumentation.branch('refuted')
+        self.last_counterexamples[direction] = counterexample
+        return False
+
+    def _z3_solver(self):
+        if self._implication_solver is None:
+            from predi.z3_backend import ImplicationSolver
+            self._implication_solver = ImplicationSolver(timeout=remaining_ms(self._deadline))
+        return self._implication_solver
+
+    def _verdict(self, implies1_to_2: bool, implies2_to_1: bool) -> str:
         if implies1_to_2 and not implies2_to_1:
-            return "The first predicate is stronger."
+            return FIRST_STRONGER_VERDICT
         elif implies2_to_1 and not implies1_to_2:
-            return "The second predicate is stronger."
+            return SECOND_STRONGER_VERDICT
         elif implies1_to_2 and implies2_to_1:
-            return "The predicates are equivalent."
+            return EQUIVALENT_VERDICT
+        else:
+            return INCOMPARABLE_VERDICT
+
+    def _disjoint(self, prepared1: PreparedPredicate, prepared2: PreparedPredicate) -> bool:
+        """
+        Whether a pair with disjoint signatures is incomparable: neither predicate simplifies
+        to a Boolean literal.
+        """
+        if self.backend == 'z3':
+            return not (self.z3_backend.is_constant(prepared1.expr) or self.z3_backend.is_constant(prepared2.expr))
+        return not any(prepared.simplified in (sp.true, sp.false) for prepared in (prepared1, prepared2))
+
+    def prepare(self, predicate: str) -> PreparedPredicate:
+        """
+        Tokenize, parse, convert and simplify a predicate for the configured backend,
+        memoized by its normalized text.
+        """
+        key = self._cache_key(predicate)
+        prepared = self.cache.get(key)
+        if prepared is None:
+            self.instrumentation.count('cache_misses')
+            prepared = self._prepare(predicate)
+            self.cache.put(key, prepared)
         else:
-            return "The predicates are not equivalent and neither is stronger."
+            self.instrumentation.count('cache_hits')
+        return prepared
+
+    def _cache_key(self, predicate: str) -> str:
+        if self._significant_whitespace.search(predicate):
+            return predicate.strip()
+        return self.tokenizer.normalize(predicate)
+
+    def _prepare(self, predicate: str) -> PreparedPredicate:
+        instrumentation = self.instrumentation
+        with instrumentation.stage('tokenize'):
+            tokens = self.tokenizer.tokenize(predicate)
+        trace.debug("Tokens: %s", tokens)
+        with instrumentation.stage('parse'):
+            ast = Parser(tokens).parse()
+        trace.debug("Parsed AST: %s", ast)
+
+        if self.backend == 'z3':
+            with instrumentation.stage('z3_lower'):
+                term = self.z3_backend.lower(ast)
+            return PreparedPredicate(tokens, ast, term, None)
+
+        # Convert the AST to a SymPy expression and simplify it
+        with instrumentation.stage('to_sympy'):
+            expr = self._to_sympy_expr(ast)
+        trace.debug('> expr: %s', expr)
+        if self._deadline is not None:
+            self._deadline.check()
+        with instrumentation.stage('simplify'):
+            simplified = self.simplifier.simplify_expr(expr, self.simplification)
+        trace.debug("Simplified SymPy Expression: %s", simplified)
+        return PreparedPredicate(tokens, ast, expr, simplified)
+
+    def compare_many(self, pairs: Iterable[Tuple[str, str]], workers: Optional[int] = None,
+                     chunksize: int = 1, ordered: bool = True) -> Iterator[ComparisonResult]:
+        """
+        Compare many predicate pairs, fanning them out across a pool of worker processes.
+        Results are yielded as soon as they are available; with `ordered` they come back in
+        input order, otherwise in completion order. An exception raised while comparing a
+        pair is reported in that pair's `error` field and does not stop the batch.
+        `workers=1` compares the pairs serially in the current process.
+        """
+        items = enumerate(pairs)
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        if workers <= 1:
+            for item in items:
+                yield self._compare_isolated(item)
+            return
+
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(type(self), self.options)) as pool:
+            if ordered:
+                results = pool.imap(_compare_in_worker, items, chunksize)
+            else:
+                results = pool.imap_unordered(_compare_in_worker, items, chunksize)
+            for result in results:
+                # Worker processes profile their own pairs; fold them into this comparator's aggregates
+                if result.profile is not None:
+                    self.instrumentation.record(result.profile)
+                yield result
+
+    def _compare_isolated(self, item: Tuple[int, Tuple[str, str]]) -> ComparisonResult:
+        index, (predicate1, predicate2) = item
+        start = time.perf_counter()
+        try:
+            verdict = self.compare(predicate1, predicate2)
+            return ComparisonResult(index, predicate1, predicate2, verdict, profile=self.instrumentation.last_pair,
+                                    counterexamples=self.last_counterexamples or None,
+                                    seconds=time.perf_counter() - start, fast_path=self.last_fast_path)
+        except Exception as e:
+            return ComparisonResult(index, predicate1, predicate2, None, f"{type(e).__name__}: {e}",
+                                    profile=self.instrumentation.last_pair, seconds=time.perf_counter() - start)
 
     def _to_sympy_expr(self, ast):
+        # Children before parents, with an explicit stack: long `&&` chains nest deeper than the recursion limit
+        converted = {}
+        stack = [(ast, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                converted[node] = self._to_sympy_node(node, [converted[child] for child in node.children])
+            elif node not in converted:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children)
+        return converted[ast]
+
+    def _to_sympy_node(self, ast, args):
         if not ast.children:
             try:
                 # Try converting to int or float if the value is a numeric string
@@ -80,7 +481,6 @@ class Comparator:
             except ValueError:
                 # If conversion fails, treat it as a symbol
                 return sp.Symbol(ast.value.replace('.', '_'))
-        args = [self._to_sympy_expr(child) for child in ast.children]
         if ast.value in ('&&', '||', '!', '==', '!=', '>', '<', '>=', '<='):
             return getattr(sp, self._sympy_operator(ast.value))(*args)
         elif ast.value == '/':
@@ -111,264 +511,237 @@ class Comparator:
 
     
     def sympy_to_z3(self, expr):
-        if isinstance(expr, sp.Symbol):
-            # Convert SymPy symbols to Z3 Real
-            return z3.Real(str(expr))
-        elif isinstance(expr, sp.Number):
-            return z3.RealVal(float(expr))
-        elif isinstance(expr, sp.Eq):
-            return self.sympy_to_z3(expr.lhs) == self.sympy_to_z3(expr.rhs)
-        elif isinstance(expr, sp.Gt):
-            return self.sympy_to_z3(expr.lhs) > self.sympy_to_z3(expr.rhs)
-        elif isinstance(expr, sp.Ge):
-            return self.sympy_to_z3(expr.lhs) >= self.sympy_to_z3(expr.rhs)
-        elif isinstance(expr, sp.Lt):
-            return self.sympy_to_z3(expr.lhs) < self.sympy_to_z3(expr.rhs)
-        elif isinstance(expr, sp.Le):
-            return self.sympy_to_z3(expr.lhs) <= self.sympy_to_z3(expr.rhs)
-        elif isinstance(expr, sp.And):
-            return And(*[self.sympy_to_z3(arg) for arg in expr.args])
-        elif isinstance(expr, sp.Or):
-            return Or(*[self.sympy_to_z3(arg) for arg in expr.args])
-        elif isinstance(expr, sp.Not):
-            return Not(self.sympy_to_z3(expr.args[0]))
-        elif isinstance(expr, sp.Ne):
-            return self.sympy_to_z3(expr.lhs) != self.sympy_to_z3(expr.rhs)
-        elif isinstance(expr, sp.Add):
-            return sum(self.sympy_to_z3(arg) for arg in expr.args)
-        elif isinstance(expr, sp.Mul):
-            result = self.sympy_to_z3(expr.args[0])
-            for arg in expr.args[1:]:
-                result *= self.sympy_to_z3(arg)
-            return result
-        elif isinstance(expr, sp.Pow):
-            base = self.sympy_to_z3(expr.args[0])
-            exponent = self.sympy_to_z3(expr.args[1])
-            return base ** exponent
-        # elif isinstance(expr, sp.Function):
-        #     # Handle function calls by converting SymPy functions to Z3 function applications
-        #     func_name = str(expr.func)
-        #     z3_func = z3.Function(func_name, *([z3.Real] * len(expr.args)), z3.Real)  # Assuming it takes and returns reals
-        #     z3_args = [self.sympy_to_z3(arg) for arg in expr.args]
-        #     return z3_func(*z3_args)
-        elif isinstance(expr, sp.Function):
-        # Handle complex paths or function calls as single Real symbols
-        # Convert the full function call into a symbol-like string
-            func_name = str(expr).replace('[', '_').replace(']', '').replace('.', '_')
-            return z3.Real(func_name)
-        else:
-            raise ValueError(f"Unsupported expression type: {expr}")
+        return self.translator.translate(expr)
 
     def _implies(self, expr1, expr2, level=0):
         """
         Check if expr1 implies expr2 by manually comparing the expressions.
         """
-        printer(f"Checking implication: {expr1} -> {expr2} (level is: {level})", level)
+        instrumentation = self.instrumentation
+        instrumentation.depth(level)
+        if self._deadline is not None:
+            self._deadline.check()
+        trace.debug("Checking implication: %s -> %s (level is: %s)", expr1, expr2, level, depth=level)
         if expr1 == expr2:
-            printer("Expressions are identical.", level)
+            trace.debug("Expressions are identical.", depth=level)
+            instrumentation.branch('identical')
             return True
 
-        # Handle equivalences through algebraic manipulation
-        try:
-            if sp.simplify(expr1 - expr2) == 0:
-                printer("Expressions are equivalent through algebraic manipulation.", level)
-                return True
-        except Exception as e: 
-            # Even if the simplification fails, we can still proceed to other strategies
-            printer(f"Error (for using sp.simplify): {e}", level)
-            pass
+        # Handle equivalences through algebraic manipulation; only terms can be subtracted, not
+        # relations or Boolean formulas
+        if isinstance(expr1, sp.Expr) and isinstance(expr2, sp.Expr):
+            try:
+                with instrumentation.stage('implies_simplify'):
+                    difference = expr1 - expr2
+                    difference = sp.simplify(difference) if self.simplification == 'full' else sp.expand(difference)
+                if difference == 0:
+                    trace.debug("Expressions are equivalent through algebraic manipulation.", depth=level)
+                    instrumentation.branch('algebraic_equivalence')
+                    return True
+            except Exception as e:
+                # Even if the simplification fails, we can still proceed to other strategies
+                trace.debug("Error (for using sp.simplify): %s", e, depth=level)
 
         # Handle negation equivalence (e.g., !used[salt] == used[salt] == false)
-        if isinstance(expr1, Not) and isinstance(expr2, sp.Equality):
-            printer('>>>>>>>>>>>> here1', level)
-            printer(f'expr2: {expr2}', level)
-            printer(f'expr2.rhs: {expr2.rhs}', level)
-            printer(f'expr2.lhs: {expr2.lhs}', level)
+        if isinstance(expr1, sp.Not) and isinstance(expr2, sp.Equality):
+            trace.debug('>>>>>>>>>>>> here1', depth=level)
+            trace.debug('expr2: %s', expr2, depth=level)
+            trace.debug('expr2.rhs: %s', expr2.rhs, depth=level)
+            trace.debug('expr2.lhs: %s', expr2.lhs, depth=level)
             if expr2.rhs == sp.false or expr2.rhs == False or expr2.rhs == sp.Symbol('false'):
-                printer('>>>>>>>>>>>> here1.1', level)
+                trace.debug('>>>>>>>>>>>> here1.1', depth=level)
+                instrumentation.branch('negation_false')
                 return self._implies(expr1.args[0], expr2.lhs, level + 1)
             if expr2.lhs == sp.false or expr2.lhs == False or expr2.lhs == sp.Symbol('false'):
-                printer('>>>>>>>>>>>> here1.2', level)
+                trace.debug('>>>>>>>>>>>> here1.2', depth=level)
+                instrumentation.branch('negation_false')
                 return self._implies(expr1.args[0], expr2.rhs, level + 1)
 
-        if isinstance(expr2, Not) and isinstance(expr1, sp.Equality):
-            printer('>>>>>>>>>>>> here2', level)
-            printer(f'expr1: {expr1}', level)
-            printer(f'expr1.rhs: {expr1.rhs}', level)
-            printer(f'expr1.lhs: {expr1.lhs}', level)
+        if isinstance(expr2, sp.Not) and isinstance(expr1, sp.Equality):
+            trace.debug('>>>>>>>>>>>> here2', depth=level)
+            trace.debug('expr1: %s', expr1, depth=level)
+            trace.debug('expr1.rhs: %s', expr1.rhs, depth=level)
+            trace.debug('expr1.lhs: %s', expr1.lhs, depth=level)
             if expr1.rhs == sp.false or expr1.rhs == False or expr1.rhs == sp.Symbol('false'):
-                printer('>>>>>>>>>>>> here2.1', level)
+                trace.debug('>>>>>>>>>>>> here2.1', depth=level)
+                instrumentation.branch('negation_false')
                 return self._implies(expr2.args[0], expr1.lhs, level + 1)
             if expr1.lhs == sp.false or expr1.lhs == False or expr1.lhs == sp.Symbol('false'):
-                printer('>>>>>>>>>>>> here2.2', level)
+                trace.debug('>>>>>>>>>>>> here2.2', depth=level)
+                instrumentation.branch('negation_false')
                 return self._implies(expr2.args[0], expr1.rhs, level + 1)
 
         # Handle equivalence involving `true`
         if isinstance(expr1, sp.Symbol) and isinstance(expr2, sp.Equality):
             if expr2.rhs == sp.true or expr2.rhs == True or expr2.rhs == sp.Symbol('true'):
+                instrumentation.branch('true_equivalence')
                 return self._implies(expr1, expr2.lhs, level + 1)
             if expr2.lhs == sp.true or expr2.lhs == True or expr2.lhs == sp.Symbol('true'):
+                instrumentation.branch('true_equivalence')
                 return self._implies(expr1, expr2.rhs, level + 1)
 
         if isinstance(expr2, sp.Symbol) and isinstance(expr1, sp.Equality):
             if expr1.rhs == sp.true or expr1.rhs == True or expr1.rhs == sp.Symbol('true'):
+                instrumentation.branch('true_equivalence')
                 return self._implies(expr2, expr1.lhs, level + 1)
             if expr1.lhs == sp.true or expr1.lhs == True or expr1.lhs == sp.Symbol('true'):
+                instrumentation.branch('true_equivalence')
                 return self._implies(expr2, expr1.rhs, level + 1)
 
         # Handle logical equivalence for AND, OR, NOT operations
-        if isinstance(expr1, Not) and isinstance(expr2, Or):
+        if isinstance(expr1, sp.Not) and isinstance(expr2, sp.Or):
             if len(expr2.args) == 2:
                 left, right = expr2.args
                 if isinstance(left, sp.Equality) and left.rhs == sp.false:
+                    instrumentation.branch('negation_or')
                     return self._implies(expr1.args[0], left.lhs, level + 1) and self._implies(right, sp.true, level + 1)
                 if isinstance(right, sp.Equality) and right.rhs == sp.false:
+                    instrumentation.branch('negation_or')
                     return self._implies(expr1.args[0], right.lhs, level + 1) and self._implies(left, sp.true, level + 1)
 
-        if isinstance(expr2, Not) and isinstance(expr1, Or):
+        if isinstance(expr2, sp.Not) and isinstance(expr1, sp.Or):
             if len(expr1.args) == 2:
                 left, right = expr1.args
                 if isinstance(left, sp.Equality) and left.rhs == sp.false:
+                    instrumentation.branch('negation_or')
                     return self._implies(expr2.args[0], left.lhs, level + 1) and self._implies(right, sp.true, level + 1)
                 if isinstance(right, sp.Equality) and right.rhs == sp.false:
+                    instrumentation.branch('negation_or')
                     return self._implies(expr2.args[0], right.lhs, level + 1) and self._implies(left, sp.true, level + 1)
 
-        if isinstance(expr1, And) and isinstance(expr2, And):
+        if isinstance(expr1, sp.And) and isinstance(expr2, sp.And):
             if len(expr1.args) == len(expr2.args):
+                instrumentation.branch('and_pairwise')
                 return all(self._implies(arg1, arg2, level + 1) for arg1, arg2 in zip(expr1.args, expr2.args))
 
-        if isinstance(expr1, Or) and isinstance(expr2, Or):
+        if isinstance(expr1, sp.Or) and isinstance(expr2, sp.Or):
             if len(expr1.args) == len(expr2.args):
+                instrumentation.branch('or_pairwise')
                 return all(self._implies(arg1, arg2, level + 1) for arg1, arg2 in zip(expr1.args, expr2.args))
 
         # Handle AND expression for expr2
-        if isinstance(expr2, And):
+        if isinstance(expr2, sp.And):
+            instrumentation.branch('and_conclusion')
             # expr1 should imply all parts of expr2 if expr2 is an AND expression
             results = [self._implies(expr1, arg, level + 1) for arg in expr2.args]
-            printer(f"Implication results for And expr2 which was `{expr1} => {expr2}`: {results}", level)
+            trace.debug("Implication results for And expr2 which was `%s => %s`: %s", expr1, expr2, results, depth=level)
             return all(results)
 
         # Handle AND expression for expr1
-        if isinstance(expr1, And):
+        if isinstance(expr1, sp.And):
+            instrumentation.branch('and_premise')
             # All parts of expr1 should imply expr2 if expr1 is an AND expression
             results = [self._implies(arg, expr2, level + 1) for arg in expr1.args]
-            printer(f"Implication results for And expr1 which was `{expr1} => {expr2}`: {results}", level)
+            trace.debug("Implication results for And expr1 which was `%s => %s`: %s", expr1, expr2, results, depth=level)
             return any(results)
 
         # Handle OR expression for expr2
-        if isinstance(expr2, Or):
+        if isinstance(expr2, sp.Or):
+            instrumentation.branch('or_conclusion')
             # expr1 should imply at least one part of expr2 if expr2 is an OR expression
             results = [self._implies(expr1, arg, level + 1) for arg in expr2.args]
-            printer(f"Implication results for Or expr2 which was `{expr1} => {expr2}`: {results}", level)
+            trace.debug("Implication results for Or expr2 which was `%s => %s`: %s", expr1, expr2, results, depth=level)
             return any(results)
 
         # Handle OR expression for expr1
-        if isinstance(expr1, Or):
+        if isinstance(expr1, sp.Or):
+            instrumentation.branch('or_premise')
             # All parts of expr1 should imply expr2 if expr1 is an OR expression
             results = [self._implies(arg, expr2, level + 1) for arg in expr1.args]
-            printer(f"Implication results for Or expr1 which was `{expr1} => {expr2}`: {results}", level)
+            trace.debug("Implication results for Or expr1 which was `%s => %s`: %s", expr1, expr2, results, depth=level)
             return all(results)
 
         # Handle function calls
         if isinstance(expr1, sp.Function) and isinstance(expr2, sp.Function):
             # Ensure the function names and the number of arguments match
+            instrumentation.branch('function')
             if expr1.func == expr2.func and len(expr1.args) == len(expr2.args):
                 return all(self._implies(arg1, arg2, level + 1) for arg1, arg2 in zip(expr1.args, expr2.args))
             return False
 
         if isinstance(expr1, sp.Symbol) and isinstance(expr2, sp.Symbol):
+            instrumentation.branch('symbol')
             return expr1 == expr2
 
         # The following acts as a part of the base case for recursion
         # Specific relational operator checks for numerical comparisons
         relational_operators = (sp.Gt, sp.Ge, sp.Lt, sp.Le, sp.Eq, sp.Ne)
         if isinstance(expr1, relational_operators) and isinstance(expr2, relational_operators):
-            printer(f'In relational base cases; expr1: {expr1}, expr2: {expr2}', level)
+            trace.debug('In relational base cases; expr1: %s, expr2: %s', expr1, expr2, depth=level)
             # Check for Eq vs non-Eq comparisons; we don't handle this well, let's return False
             if (isinstance(expr1, sp.Eq) and not isinstance(expr2, sp.Eq)) or (not isinstance(expr1, sp.Eq) and isinstance(expr2, sp.Eq)):
-                printer(f'One of the expressions is equality and the other is not; expr1: {expr1}, expr2: {expr2}', level)     
+                trace.debug('One of the expressions is equality and the other is not; expr1: %s, expr2: %s', expr1, expr2, depth=level)
 
                 # switch to z3
-                printer(f'Switching to Z3 ..... ')
-                z3_expr1 = self.sympy_to_z3(expr1)
-                z3_expr2 = self.sympy_to_z3(expr2)
-
-                solver = z3.Solver()
-                solver.add(z3.And(z3_expr1, z3.Not(z3_expr2)))
-
-                #solver.add(self.sympy_to_z3(negation))
-                result = solver.check()
+                trace.debug('Switching to Z3 ..... ')
+                instrumentation.branch('z3_equality')
+                with instrumentation.stage('sympy_to_z3'):
+                    z3_expr1 = self.sympy_to_z3(expr1)
+                    z3_expr2 = self.sympy_to_z3(expr2)
 
-                if solver.check() == z3.sat:
-                    printer(f"Implies {expr1} to {expr2}: False", level=0)
-                    return False
-                else:
-                    printer(f"Implies {expr1} to {expr2}: True", level=0)
-                    return True
+                with instrumentation.stage('z3_check'):
+                    result = self._z3_solver().implies(z3_expr1, z3_expr2)
+                trace.debug("Implies %s to %s: %s", expr1, expr2, result)
+                return result
             elif all(isinstance(arg, (sp.Float, sp.Integer, sp.Symbol)) for arg in [expr1.lhs, expr1.rhs, expr2.lhs, expr2.rhs]):
-                printer(f'Inside!... expr1: {expr1}, expr2: {expr2}', level)
+                trace.debug('Inside!... expr1: %s, expr2: %s', expr1, expr2, depth=level)
+                instrumentation.branch('satisfiable_atoms')
                 # Check if the negation of the implication is not satisfiable
                 try:
-                    negation = sp.And(expr1, Not(expr2))
-                    printer(f"Negation of the implication {expr1} -> {expr2}: {satisfiable(negation)}; type of {type(satisfiable(negation))}", level)
-                    result = not satisfiable(negation, use_lra_theory=True)
-                    printer(f"Implication {expr1} -> {expr2} using satisfiable: {result}", level)
+                    negation = sp.And(expr1, sp.Not(expr2))
+                    with instrumentation.stage('satisfiable'):
+                        model = inference.satisfiable(negation, use_lra_theory=True)
+                    trace.debug("Negation of the implication %s -> %s: %s", expr1, expr2, model, depth=level)
+                    result = not model
+                    trace.debug("Implication %s -> %s using satisfiable: %s", expr1, expr2, result, depth=level)
                     return result
                 except Exception as e:
-                    printer(f"Error (satisfiability error): {e}", level)
+                    trace.debug("Error (satisfiability error): %s", e, depth=level)
                     return False
             else:
-                printer(f'Not all arguments are numbers, floats, or symbols in expr1 and expr2, however, we still try to use the same sympy satisfiability check', level)
+                trace.debug('Not all arguments are numbers, floats, or symbols in expr1 and expr2, however, we still try to use the same sympy satisfiability check', depth=level)
 
                 # print type of all lhs and rhs's of both expressions
-                printer(f'type of expr1.lhs: {type(expr1.lhs)}')
-                printer(f'type of expr1.rhs: {type(expr1.rhs)}')
-                printer(f'type of expr2.lhs: {type(expr2.lhs)}')
-                printer(f'type of expr2.rhs: {type(expr2.rhs)}')
+                trace.debug('type of expr1.lhs: %s', type(expr1.lhs))
+                trace.debug('type of expr1.rhs: %s', type(expr1.rhs))
+                trace.debug('type of expr2.lhs: %s', type(expr2.lhs))
+                trace.debug('type of expr2.rhs: %s', type(expr2.rhs))
 
 
 
                 # even if one of the above lhs and rhs's is sympy.core.mul.Mul and then one of its args is a number or a float bigger or lower than 1, we should switch to z3; we are not handling "1" case since it is working with sympy already, don't want to break a working prototype
                 if any(isinstance(arg, sp.Mul) and any(isinstance(a, (sp.Number, sp.Float)) and (a > 1 or a < 1) for a in arg.args) for arg in [expr1.lhs, expr1.rhs, expr2.lhs, expr2.rhs]):
-                    printer(f'One of the arguments is a Mul, switching to z3 ...', level)
-                    
+                    trace.debug('One of the arguments is a Mul, switching to z3 ...', depth=level)
+                    instrumentation.branch('z3_scaled')
 
-                    z3_expr1 = self.sympy_to_z3(expr1)
-                    z3_expr2 = self.sympy_to_z3(expr2)
+                    with instrumentation.stage('sympy_to_z3'):
+                        z3_expr1 = self.sympy_to_z3(expr1)
+                        z3_expr2 = self.sympy_to_z3(expr2)
 
                     variables = {str(sym) for sym in expr1.free_symbols.union(expr2.free_symbols)}
-                    z3_vars = {var: z3.Real(var) for var in variables}  # Convert to Z3 Reals
-
-
 
-                    solver = z3.Solver()
+                    # Assume all variables are greater than 0; the constraints are asserted once per
+                    # comparison and enabled through assumption literals
+                    solver = self._z3_solver()
+                    positive = tuple(solver.guard(self.translator.constant(var) > 0) for var in sorted(variables))
 
-                    # Add constraints to ensure all variables are greater than 0
-                    for var in z3_vars.values():
-                        solver.add(var > 0)  
-
-                    solver.add(z3_expr1, z3.Not(z3_expr2))
-
-
-
-    
-                    # Check satisfiability
-                    if solver.check() == z3.sat:
-                        # If satisfiable, implication does not hold
-                        printer(f"Implies {expr1} to {expr2}: False", level=0)
-                        return False
-                    else:
-                        # If unsatisfiable, implication holds
-                        printer(f"Implies {expr1} to {expr2}: True", level=0)
-                        return True
+                    # Unsatisfiable negation means the implication holds
+                    with instrumentation.stage('z3_check'):
+                        result = solver.implies(z3_expr1, z3_expr2, positive)
+                    trace.debug("Implies %s to %s: %s", expr1, expr2, result)
+                    return result
                 else: 
+                    instrumentation.branch('satisfiable_terms')
                     try:
-                        negation = sp.And(expr1, Not(expr2))
-                        printer(f"Negation of the implication {expr1} -> {expr2}: {satisfiable(negation)}; type of {type(satisfiable(negation))}", level)
-                        result = not satisfiable(negation, use_lra_theory=True)
-                        printer(f"Implication {expr1} -> {expr2} using satisfiable: {result}", level)
+                        negation = sp.And(expr1, sp.Not(expr2))
+                        with instrumentation.stage('satisfiable'):
+                            model = inference.satisfiable(negation, use_lra_theory=True)
+                        trace.debug("Negation of the implication %s -> %s: %s", expr1, expr2, model, depth=level)
+                        result = not model
+                        trace.debug("Implication %s -> %s using satisfiable: %s", expr1, expr2, result, depth=level)
                         return result
                     except Exception as e:
-                        printer(f"Error (satisfiability error): {e}", level)
+                        trace.debug("Error (satisfiability error): %s", e, depth=level)
                         return False
-        return False
\ No newline at end of file
+        instrumentation.branch('no_rule')
+        return False
@@ -0,0 +1,111 @@
+import logging
+import os
+import sys
+from typing import Any, Callable, Dict, Optional, Union
+import yaml
+from colorama import Fore, Style
+
+
+# The `debugging` section of this file switches tracing on per module, e.g. `comparator: true`
+CONFIG_FILE = os.environ.get('PREDI_CONFIG', 'config.yaml')
+
+INDENT = '  '
+
+# debug_print message types, mapped to a log level and a color
+MESSAGE_TYPES = {
+    'neutral': (logging.DEBUG, ''),
+    'info': (logging.INFO, Fore.CYAN),
+    'success': (logging.INFO, Fore.GREEN),
+    'warning': (logging.WARNING, Fore.YELLOW),
+    'exception': (logging.ERROR, Fore.RED),
+}
+
+_config = None
+
+
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load (once) the YAML configuration; a missing file means every switch is off.
+    """
+    global _config
+    if _config is None or path is not None:
+        path = path or CONFIG_FILE
+        try:
+            with open(path, 'r') as config_file:
+                _config = yaml.safe_load(config_file) or {}
+        except FileNotFoundError:
+            _config = {}
+    return _config
+
+
+def is_debugging(module: str) -> bool:
+    return bool((load_config().get('debugging') or {}).get(module, False))
+
+
+class Tracer:
+    """
+    Tracing for one module, backed by the `predi.<module>` logger.
+
+    Messages use lazy %-style arguments, so nothing is formatted while tracing is off; traces
+    whose arguments are themselves expensive to compute should be guarded by `enabled`.
+    The `depth` argument indents a message, e.g. by recursion level.
+    """
+    def __init__(self, module: str):
+        self.module = module
+        self.logger = logging.getLogger(f'predi.{module}')
+        self.logger.setLevel(logging.DEBUG if is_debugging(module) else logging.WARNING)
+
+    @property
+    def enabled(self) -> bool:
+        return self.logger.isEnabledFor(logging.DEBUG)
+
+    def debug(self, message: Union[str, Callable[[], str]], *args, depth: int = 0) -> None:
+        self.log(logging.DEBUG, message, *args, depth=depth)
+
+    def info(self, message: Union[str, Callable[[], str]], *args, depth: int = 0) -> None:
+        self.log(logging.INFO, message, *args, depth=depth)
+
+    def log(self, level: int, message: Union[str, Callable[[], str]], *args, depth: int = 0) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        if callable(message):
+            message = message()
+        if depth:
+            message = INDENT * depth + message
+        self.logger.log(level, message, *args)
+
+
+_tracers: Dict[str, Tracer] = {}
+
+
+def get_tracer(module: str) -> Tracer:
+    tracer = _tracers.get(module)
+    if tracer is None:
+        tracer = _tracers[module] = Tracer(module)
+    return tracer
+
+
+def debug_print(message: str, type_: str = 'neutral', module: Optional[str] = None) -> None:
+    """
+    Print a colored trace message if debugging is switched on in config.yaml for `module`
+    (by default the calling module, e.g. `test_comparator_with_dataset`).
+    """
+    if module is None:
+        module = sys._getframe(1).f_globals.get('__name__', '').rpartition('.')[2]
+    tracer = get_tracer(module)
+    if not tracer.enabled:
+        return
+    level, color = MESSAGE_TYPES.get(type_, MESSAGE_TYPES['neutral'])
+    tracer.log(level, f"{color}{message}{Style.RESET_ALL}" if color else message)
+
+
+def _configure_logging() -> None:
+    logger = logging.getLogger('predi')
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.propagate = False
+
+
+_configure_logging()
@@ -0,0 +1,69 @@
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+
+class ComparisonTimeout(BaseException):
+    """
+    Raised when a comparison runs past its time budget. Like KeyboardInterrupt it derives from
+    BaseException, so the `except Exception` fallbacks inside the comparator cannot swallow it.
+    """
+
+
+class Deadline:
+    """
+    Point in time by which a comparison has to finish.
+
+    `check` is the cooperative cancellation point used between steps. `enforce` additionally
+    interrupts long pure-Python computations (`sp.simplify`, `satisfiable`) with SIGALRM;
+    this is only possible in the main thread on POSIX systems and is skipped when another
+    interval timer is already running, in which case only the cooperative checks apply.
+    Z3 queries are bounded separately through the solver `timeout` parameter.
+    """
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def remaining_ms(self) -> int:
+        # Z3 treats a timeout of 0 as "no timeout"
+        return max(1, int(self.remaining() * 1000))
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        if self.expired():
+            raise ComparisonTimeout(f"Comparison exceeded its time budget of {self.seconds:.3f}s")
+
+    @contextmanager
+    def enforce(self):
+        if not self._can_use_alarm():
+            yield self
+            return
+
+        def on_alarm(signum, frame):
+            raise ComparisonTimeout(f"Comparison exceeded its time budget of {self.seconds:.3f}s")
+
+        previous_handler = signal.signal(signal.SIGALRM, on_alarm)
+        try:
+            self.check()
+            signal.setitimer(signal.ITIMER_REAL, self.remaining())
+            yield self
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+
+    @staticmethod
+    def _can_use_alarm() -> bool:
+        return (hasattr(signal, 'setitimer')
+                and threading.current_thread() is threading.main_thread()
+                and signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0))
+
+
+def remaining_ms(deadline: Optional[Deadline]) -> Optional[int]:
+    return deadline.remaining_ms() if deadline is not None else None
@@ -0,0 +1,183 @@
+import argparse
+import csv
+import sys
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from predi.comparator import Comparator, ComparisonResult, FIRST_STRONGER_VERDICT, SECOND_STRONGER_VERDICT, Verdict
+from predi.parser import Parser
+from predi.syntactic import fingerprint
+from predi.tokenizer import Tokenizer
+from predi.verdict_store import VerdictStore, pair_key
+
+
+# Verdict of a pair compared the other way round
+MIRRORED_VERDICTS = {FIRST_STRONGER_VERDICT: SECOND_STRONGER_VERDICT, SECOND_STRONGER_VERDICT: FIRST_STRONGER_VERDICT}
+MIRRORED_DIRECTIONS = {'1->2': '2->1', '2->1': '1->2'}
+# New verdicts written to a verdict store at a time
+STORE_BATCH = 256
+
+
+def canonical_key(predicate: str, tokenizer: Optional[Tokenizer] = None) -> str:
+    """
+    Key under which equivalent spellings of a predicate group together: the fingerprint of its
+    canonical AST (whitespace, parentheses, operand order of commutative operators and the
+    direction of relations do not matter). A predicate that does not parse is keyed by its
+    normalized text, so it only groups with identical spellings.
+    """
+    tokenizer = tokenizer if tokenizer is not None else Tokenizer()
+    try:
+        return fingerprint(Parser(tokenizer.tokenize(predicate)).parse())
+    except ValueError:
+        return 'text:' + tokenizer.normalize(predicate)
+
+
+def group_predicates(predicates: Iterable[str], tokenizer: Optional[Tokenizer] = None) -> Dict[str, List[int]]:
+    """
+    Positions of the predicates, grouped by canonical key, in order of first occurrence.
+    """
+    tokenizer = tokenizer if tokenizer is not None else Tokenizer()
+    groups = defaultdict(list)
+    for position, predicate in enumerate(predicates):
+        groups[canonical_key(predicate, tokenizer)].append(position)
+    return dict(groups)
+
+
+class PairIndex(NamedTuple):
+    """
+    Where the verdict of a pair comes from: the unique pair it was folded into, and whether
+    that pair has its predicates the other way round.
+    """
+    unique: int
+    swapped: bool
+
+
+def dedupe_pairs(pairs: Iterable[Tuple[str, str]],
+                 tokenizer: Optional[Tokenizer] = None) -> Tuple[List[Tuple[str, str]], List[PairIndex]]:
+    """
+    Fold predicate pairs that are equal up to canonical form, in either order. Returns the
+    unique pairs (the first spelling seen of each) and, for every input pair, its PairIndex.
+    """
+    unique_pairs, _, indexes = _fold_pairs(pairs, tokenizer)
+    return unique_pairs, indexes
+
+
+def _fold_pairs(pairs: Iterable[Tuple[str, str]], tokenizer: Optional[Tokenizer] = None
+                ) -> Tuple[List[Tuple[str, str]], List[str], List[PairIndex]]:
+    # `dedupe_pairs`, also returning the store key (see `predi.verdict_store`) of each unique pair
+    tokenizer = tokenizer if tokenizer is not None else Tokenizer()
+    keys: Dict[str, str] = {}
+
+    def key_of(predicate: str) -> str:
+        if predicate not in keys:
+            keys[predicate] = canonical_key(predicate, tokenizer)
+        return keys[predicate]
+
+    unique: Dict[Tuple[str, str], int] = {}
+    unique_pairs: List[Tuple[str, str]] = []
+    unique_keys: List[str] = []
+    indexes: List[PairIndex] = []
+    for predicate1, predicate2 in pairs:
+        key1, key2 = key_of(predicate1), key_of(predicate2)
+        swapped = key2 < key1
+        key = (key2, key1) if swapped else (key1, key2)
+        position = unique.get(key)
+        if position is None:
+            position = unique[key] = len(unique_pairs)
+            unique_pairs.append((predicate2, predicate1) if swapped else (predicate1, predicate2))
+            unique_keys.append(pair_key(*key))
+        indexes.append(PairIndex(position, swapped))
+    return unique_pairs, unique_keys, indexes
+
+
+def compare_deduplicated(pairs: Iterable[Tuple[str, str]], comparator: Optional[Comparator] = None,
+                         workers: Optional[int] = None, chunksize: int = 1,
+                         store: Optional[VerdictStore] = None) -> Iterator[ComparisonResult]:
+    """
+    `Comparator.compare_many` that solves each unique pair (see `dedupe_pairs`) once and maps
+    the verdicts back to every input pair, yielding the results in input order with the
+    predicates as given. Unlike `compare_many`, all pairs are read before the first result.
+    With a verdict `store`, unique pairs it has a verdict for are not compared at all (their
+    results carry no timing or counterexamples), and new verdicts are added to it.
+    """
+    comparator = comparator if comparator is not None else Comparator()
+    pairs = list(pairs)
+    unique_pairs, unique_keys, indexes = _fold_pairs(pairs, comparator.tokenizer)
+    # Input pairs waiting for each unique pair, and the results that cannot be yielded yet
+    waiting: Dict[int, List[int]] = defaultdict(list)
+    for index, pair_index in enumerate(indexes):
+        waiting[pair_index.unique].append(index)
+    ready: Dict[int, ComparisonResult] = {}
+    next_index = 0
+    if store is None:
+        results = comparator.compare_many(unique_pairs, workers=workers, chunksize=chunksize, ordered=False)
+    else:
+        results = _compare_stored(unique_pairs, unique_keys, comparator, store, workers, chunksize)
+    for result in results:
+        for index in waiting.pop(result.index):
+            verdict, counterexamples = result.verdict, result.counterexamples
+            if indexes[index].swapped:
+                verdict = MIRRORED_VERDICTS.get(verdict, verdict)
+                if counterexamples:
+                    counterexamples = {MIRRORED_DIRECTIONS[direction]: counterexample
+                                       for direction, counterexample in counterexamples.items()}
+            ready[index] = result._replace(index=index, predicate1=pairs[index][0], predicate2=pairs[index][1],
+                                           verdict=verdict, counterexamples=counterexamples)
+        while next_index in ready:
+            yield ready.pop(next_index)
+            next_index += 1
+
+
+def _compare_stored(unique_pairs: List[Tuple[str, str]], unique_keys: List[str], comparator: Comparator,
+                    store: VerdictStore, workers: Optional[int], chunksize: int) -> Iterator[ComparisonResult]:
+    stored = store.get_many(unique_keys)
+    missing = []
+    for position, (predicate1, predicate2) in enumerate(unique_pairs):
+        verdict = stored.get(unique_keys[position])
+        if verdict is None:
+            missing.append(position)
+        else:
+            yield ComparisonResult(position, predicate1, predicate2, verdict.text)
+
+    new_verdicts = []
+    try:
+        for result in comparator.compare_many([unique_pairs[position] for position in missing], workers=workers,
+                                              chunksize=chunksize, ordered=False):
+            position = missing[result.index]
+            if result.error is None:
+                new_verdicts.append((unique_keys[position], Verdict.of(result.verdict)))
+                if len(new_verdicts) >= STORE_BATCH:
+                    store.put_many(new_verdicts)
+                    new_verdicts = []
+            yield result._replace(index=position)
+    finally:
+        store.put_many(new_verdicts)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Group the predicates of a CSV file by canonical form.')
+    parser.add_argument('input_file', help='CSV file with a predicate column')
+    parser.add_argument('-o', '--output', help='CSV file to write the rows with their canonical key to (default: stdout)')
+    parser.add_argument('-c', '--column', default='predicate', help='column holding the predicates')
+    args = parser.parse_args(argv)
+
+    with open(args.input_file, 'r', newline='') as csvfile:
+        rows = list(csv.DictReader(csvfile))
+    groups = group_predicates(row[args.column] for row in rows)
+    group_of = {position: group for group, positions in enumerate(groups.values()) for position in positions}
+    keys = {position: key for key, positions in groups.items() for position in positions}
+
+    csvfile = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        writer = csv.DictWriter(csvfile, fieldnames=(list(rows[0]) if rows else []) + ['canonical_key', 'group'])
+        writer.writeheader()
+        for position, row in enumerate(rows):
+            writer.writerow({**row, 'canonical_key': keys[position], 'group': group_of[position]})
+    finally:
+        if args.output:
+            csvfile.close()
+    print(f"Rows: {len(rows)}", file=sys.stderr)
+    print(f"Unique predicates: {len(groups)}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
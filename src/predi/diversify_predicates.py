@@ -1,8 +1,17 @@
+import argparse
 import csv
 import random
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence
 from predi.config import debug_print
 
-def advanced_diversify_predicate(predicate):
+# Rows handed to a worker process (and seeded) at a time
+CHUNK_SIZE = 1024
+
+def advanced_diversify_predicate(predicate, rng=random):
     # Define the diversification strategies
     strategies = [
         change_logical_operators,
@@ -12,10 +21,10 @@ def advanced_diversify_predicate(predicate):
         random_modification
     ]
     # Apply a random strategy for diversification
-    strategy = random.choice(strategies)
-    return strategy(predicate)
+    strategy = rng.choice(strategies)
+    return strategy(predicate, rng)
 
-def change_logical_operators(predicate):
+def change_logical_operators(predicate, rng=random):
     if '&&' in predicate:
         return predicate.replace('&&', '||')
     elif '||' in predicate:
@@ -23,7 +32,7 @@ def change_logical_operators(predicate):
     else:
         return predicate
 
-def negate_condition(predicate):
+def negate_condition(predicate, rng=random):
     if '==' in predicate:
         return predicate.replace('==', '!=')
     elif '!=' in predicate:
@@ -39,49 +48,166 @@ def negate_condition(predicate):
     else:
         return f"!({predicate})"
 
-def add_complexity(predicate):
+def add_complexity(predicate, rng=random):
     complex_conditions = [
         f"({predicate}) || (a < b)",
         f"({predicate}) && (a > b)",
         f"({predicate}) || (msg.value > 0)",
         f"({predicate}) && (msg.value == 0)"
     ]
-    return random.choice(complex_conditions)
+    return rng.choice(complex_conditions)
 
-def simplify_condition(predicate):
+def simplify_condition(predicate, rng=random):
     if '&&' in predicate or '||' in predicate:
         return predicate.split('&&')[0].strip().split('||')[0].strip()
     return predicate
 
-def random_modification(predicate):
+def random_modification(predicate, rng=random):
     modifications = [
         f"({predicate}) && (true)",
         f"({predicate}) || (false)",
         f"({predicate}) && (msg.sender != address(0))",
         f"({predicate}) || (block.number > 0)"
     ]
-    return random.choice(modifications)
-
-def diversify_predicates(input_file, output_file):
-    with open(input_file, 'r') as csvfile:
-        reader = csv.DictReader(csvfile)
-        fieldnames = reader.fieldnames + ['diversified_predicate']
-        rows = []
-
-        for row in reader:
-            original_predicate = row['predicate']
-            diversified_predicate = advanced_diversify_predicate(original_predicate)
-            row['diversified_predicate'] = diversified_predicate
-            rows.append(row)
-            #debug_print('diversify_predicates', f"Original: {original_predicate} => Diversified: {diversified_predicate}")
-
-    with open(output_file, 'w', newline='') as csvfile:
+    return rng.choice(modifications)
+
+def chunk_rng(seed, chunk_index):
+    # Every chunk has its own generator, so the output does not depend on how chunks are
+    # spread across processes
+    return random.Random(f'{seed}:{chunk_index}')
+
+def read_rows(input_file) -> Iterator[Dict[str, str]]:
+    with open(input_file, 'r', newline='') as csvfile:
+        yield from csv.DictReader(csvfile)
+
+def write_rows(rows: Iterable[Dict[str, str]], output_file, fieldnames: Sequence[str]) -> int:
+    """
+    Stream rows to a CSV file (or stdout for `-`), returning the number written.
+    """
+    csvfile = open(output_file, 'w', newline='') if output_file != '-' else sys.stdout
+    try:
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         writer.writeheader()
-        writer.writerows(rows)
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        return count
+    finally:
+        if output_file != '-':
+            csvfile.close()
+
+def _chunks(items: Iterable, size: int) -> Iterator[List]:
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+def _ordered_map(function: Callable, tasks: Iterable, workers: int, initializer=None, initargs=()) -> Iterator:
+    """
+    Apply `function` to each task, on `workers` processes if more than one, yielding the
+    results in task order. At most two tasks per worker are in flight, so tasks are consumed
+    as the results are, and memory stays bounded however many tasks there are.
+    """
+    if workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for task in tasks:
+            yield function(task)
+        return
+    with ProcessPoolExecutor(workers, initializer=initializer, initargs=initargs) as executor:
+        pending = deque()
+        for task in tasks:
+            pending.append(executor.submit(function, task))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _diversify_chunk(task):
+    seed, chunk_index, rows = task
+    rng = chunk_rng(seed, chunk_index)
+    for row in rows:
+        row['diversified_predicate'] = advanced_diversify_predicate(row['predicate'], rng)
+        #debug_print('diversify_predicates', f"Original: {row['predicate']} => Diversified: {row['diversified_predicate']}")
+    return rows
+
+def diversify_rows(rows: Iterable[Dict[str, str]], seed=0, workers: int = 1,
+                   chunksize: int = CHUNK_SIZE) -> Iterator[Dict[str, str]]:
+    """
+    Lazily add a `diversified_predicate` to every row, in chunks of `chunksize` rows spread
+    across `workers` processes. The same rows, seed and chunk size always give the same output.
+    """
+    tasks = ((seed, chunk_index, chunk) for chunk_index, chunk in enumerate(_chunks(rows, chunksize)))
+    for chunk in _ordered_map(_diversify_chunk, tasks, workers):
+        yield from chunk
+
+# Corpus the synthetic rows of a worker process are drawn from
+_base_predicates: List[str] = []
+
+def _init_synthesis(predicates):
+    global _base_predicates
+    _base_predicates = predicates
+
+def _synthesize_chunk(task):
+    seed, chunk_index, start, count = task
+    rng = chunk_rng(seed, chunk_index)
+    rows = []
+    for index in range(start, start + count):
+        predicate = rng.choice(_base_predicates)
+        # Stacked strategies give more distinct pairs than the corpus has predicates
+        diversified = predicate
+        for _ in range(rng.randint(1, 3)):
+            diversified = advanced_diversify_predicate(diversified, rng)
+        rows.append({'index': index, 'predicate': predicate, 'diversified_predicate': diversified})
+    return rows
+
+def synthesize_rows(predicates: Sequence[str], count: int, seed=0, workers: int = 1,
+                    chunksize: int = CHUNK_SIZE) -> Iterator[Dict[str, str]]:
+    """
+    Lazily generate `count` synthetic pairs (`index`, `predicate`, `diversified_predicate`) for
+    load testing, drawing the predicates from `predicates` and diversifying each one by one to
+    three random strategies. Only the base corpus is kept in memory, so `count` can run into
+    the millions; the output is determined by the corpus, `count`, seed and chunk size.
+    """
+    tasks = ((seed, chunk_index, start, min(chunksize, count - start))
+             for chunk_index, start in enumerate(range(0, count, chunksize)))
+    for chunk in _ordered_map(_synthesize_chunk, tasks, workers, _init_synthesis, (list(predicates),)):
+        yield from chunk
+
+def diversify_predicates(input_file, output_file, seed=0, workers: int = 1, chunksize: int = CHUNK_SIZE) -> int:
+    """
+    Diversify every predicate of `input_file` into `output_file`, streaming the rows through
+    in chunks. Returns the number of rows written.
+    """
+    with open(input_file, 'r', newline='') as csvfile:
+        fieldnames = csv.DictReader(csvfile).fieldnames + ['diversified_predicate']
+    rows = diversify_rows(read_rows(input_file), seed, workers, chunksize)
+    return write_rows(rows, output_file, fieldnames)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Add a diversified variant to every predicate of a CSV file, or '
+                                                 'generate a synthetic corpus of predicate pairs.')
+    parser.add_argument('input_file', nargs='?', default='datasets/predicate_sample_10000.csv',
+                        help='CSV file with a `predicate` column')
+    parser.add_argument('-o', '--output', default='datasets/diversified_predicates.csv', help='CSV file to write (`-` for stdout)')
+    parser.add_argument('-s', '--seed', default='0', help='seed of the random strategies')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='number of worker processes')
+    parser.add_argument('-c', '--chunksize', type=int, default=CHUNK_SIZE, help='rows handed to a worker at a time')
+    parser.add_argument('-n', '--rows', type=int, default=None,
+                        help='generate this many synthetic pairs from the predicates of the input file instead')
+    args = parser.parse_args(argv)
+
+    if args.rows is None:
+        count = diversify_predicates(args.input_file, args.output, args.seed, args.workers, args.chunksize)
+    else:
+        predicates = [row['predicate'] for row in read_rows(args.input_file)]
+        rows = synthesize_rows(predicates, args.rows, args.seed, args.workers, args.chunksize)
+        count = write_rows(rows, args.output, ['index', 'predicate', 'diversified_predicate'])
+    print(f"Rows written: {count}", file=sys.stderr)
 
 
 if __name__ == '__main__':
-    input_file = 'datasets/predicate_sample_10000.csv'
-    output_file = 'datasets/diversified_predicates.csv'
-    diversify_predicates(input_file, output_file)
+    main()
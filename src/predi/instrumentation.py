@@ -0,0 +1,147 @@
+import json
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterable, List, Optional
+
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(values: Iterable[float]) -> Dict[str, float]:
+    values = sorted(values)
+    summary = {
+        'count': len(values),
+        'total': sum(values),
+        'mean': sum(values) / len(values) if values else 0.0,
+        'max': values[-1] if values else 0.0,
+    }
+    for p in PERCENTILES:
+        summary[f'p{p}'] = percentile(values, p)
+    return summary
+
+
+class Instrumentation:
+    """
+    Per-pair timing and counters for Comparator.compare, aggregated across a batch.
+
+    A pair profile records the wall time spent in each stage (and how often the stage ran),
+    named counters, the decision branches that fired and the deepest `_implies` recursion.
+    Finished profiles are kept as plain dicts, so profiles produced in worker processes can
+    be merged with `record`.
+    """
+    def __init__(self):
+        self.pairs = 0
+        self.current: Optional[Dict[str, Any]] = None
+        self.last_pair: Optional[Dict[str, Any]] = None
+        self.stage_times: Dict[str, List[float]] = defaultdict(list)
+        self.stage_calls: Dict[str, List[int]] = defaultdict(list)
+        self.counters: Dict[str, List[int]] = defaultdict(list)
+        self.depths: List[int] = []
+        self.branches = Counter()
+
+    @contextmanager
+    def pair(self):
+        self.current = {'stages': defaultdict(float), 'calls': Counter(), 'counters': Counter(),
+                        'branches': Counter(), 'max_depth': 0}
+        start = time.perf_counter()
+        try:
+            yield self.current
+        finally:
+            profile = self.current
+            self.current = None
+            profile['stages']['total'] = time.perf_counter() - start
+            profile['calls']['total'] += 1
+            self.last_pair = {key: dict(value) if isinstance(value, dict) else value for key, value in profile.items()}
+            self.record(self.last_pair)
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.current is not None:
+                self.current['stages'][name] += time.perf_counter() - start
+                self.current['calls'][name] += 1
+
+    def count(self, name: str, amount: int = 1) -> None:
+        if self.current is not None:
+            self.current['counters'][name] += amount
+
+    def branch(self, name: str) -> None:
+        if self.current is not None:
+            self.current['branches'][name] += 1
+
+    def depth(self, level: int) -> None:
+        if self.current is not None:
+            self.current['counters']['implies_calls'] += 1
+            if level > self.current['max_depth']:
+                self.current['max_depth'] = level
+
+    def record(self, profile: Dict[str, Any]) -> None:
+        """
+        Add a finished pair profile to the batch aggregates.
+        """
+        self.pairs += 1
+        for name, elapsed in profile['stages'].items():
+            self.stage_times[name].append(elapsed)
+            self.stage_calls[name].append(profile['calls'].get(name, 0))
+        for name, value in profile['counters'].items():
+            self.counters[name].append(value)
+        self.depths.append(profile['max_depth'])
+        self.branches.update(profile['branches'])
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Batch histograms: per-stage wall time and call counts, per-pair counters and recursion
+        depth (count/total/mean/max/p50/p95/p99 over the pairs that hit them), branch totals.
+        """
+        return {
+            'pairs': self.pairs,
+            'stages': {name: dict(summarize(times), calls=summarize(self.stage_calls[name]))
+                       for name, times in sorted(self.stage_times.items())},
+            'counters': {name: summarize(values) for name, values in sorted(self.counters.items())},
+            'recursion_depth': summarize(self.depths),
+            'branches': dict(self.branches.most_common()),
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.summary(), **kwargs)
+
+    def export(self, path: str) -> None:
+        with open(path, 'w') as json_file:
+            json_file.write(self.to_json(indent=2))
+
+    def reset(self) -> None:
+        self.__init__()
+
+
+class NullInstrumentation(Instrumentation):
+    """
+    Instrumentation that records nothing, used when a Comparator is not instrumented.
+    """
+    def pair(self):
+        return nullcontext()
+
+    def stage(self, name: str):
+        return nullcontext()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        pass
+
+    def branch(self, name: str) -> None:
+        pass
+
+    def depth(self, level: int) -> None:
+        pass
@@ -0,0 +1,192 @@
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from predi.comparator import (Comparator, EQUIVALENT_VERDICT, FIRST_STRONGER_VERDICT,
+                              SECOND_STRONGER_VERDICT)
+from predi.parser import ASTNode, Parser
+from predi.syntactic import Signature, may_imply, signature
+
+
+class ImplicationIndex:
+    """
+    Implication order over a corpus of predicates, for "which predicates are stronger/weaker
+    than X" queries.
+
+    Predicates the comparator finds equivalent share a node; nodes are linked by the covering
+    edges of the order (the Hasse diagram), from stronger to weaker. Locating a predicate in
+    the order only compares it with the nodes its signature does not rule out (through
+    inverted indexes on the names the nodes mention and require), and every verdict is
+    propagated along the diagram: a node implied by the predicate makes all weaker nodes
+    implied too, a node that is not makes no stronger node implied, and dually. The
+    comparator is a heuristic, so transitivity is assumed rather than checked; the first
+    verdict reached for a node wins.
+    """
+    def __init__(self, comparator: Optional[Comparator] = None, predicates: Iterable[str] = ()):
+        self.comparator = comparator if comparator is not None else Comparator()
+        self.members: List[List[str]] = []
+        self.signatures: List[Signature] = []
+        self.stronger_covers: List[Set[int]] = []
+        self.weaker_covers: List[Set[int]] = []
+        self.comparisons = 0
+        self.inferred = 0
+        self.pruned = 0
+        self._nodes: Dict[ASTNode, int] = {}
+        self._mentioning: Dict[str, Set[int]] = defaultdict(set)
+        self._requiring: Dict[str, Set[int]] = defaultdict(set)
+        # Nodes that require no name, and so cannot be pruned by names
+        self._unconstrained: Set[int] = set()
+        for predicate in predicates:
+            self.add(predicate)
+
+    def __len__(self) -> int:
+        return sum(len(members) for members in self.members)
+
+    def add(self, predicate: str) -> int:
+        """
+        Insert a predicate into the order and return the id of its node.
+        """
+        ast, signature_, node, stronger, weaker = self._locate(predicate)
+        if node is not None:
+            self.members[node].append(predicate)
+            self._nodes.setdefault(ast, node)
+            return node
+
+        node = len(self.members)
+        self.members.append([predicate])
+        self.signatures.append(signature_)
+        self._nodes[ast] = node
+        for name in signature_.symbols:
+            self._mentioning[name].add(node)
+        if signature_.required_symbols:
+            for name in signature_.required_symbols:
+                self._requiring[name].add(node)
+        else:
+            self._unconstrained.add(node)
+
+        # The closest stronger nodes have no weaker neighbour among the stronger nodes
+        parents = {other for other in stronger if not self.weaker_covers[other] & stronger}
+        children = {other for other in weaker if not self.stronger_covers[other] & weaker}
+        self.stronger_covers.append(parents)
+        self.weaker_covers.append(children)
+        for parent in parents:
+            for child in children:
+                self.weaker_covers[parent].discard(child)
+                self.stronger_covers[child].discard(parent)
+            self.weaker_covers[parent].add(node)
+        for child in children:
+            self.stronger_covers[child].add(node)
+        return node
+
+    def stronger(self, predicate: str) -> List[str]:
+        """
+        Corpus predicates that imply `predicate` but are not equivalent to it.
+        """
+        return self._predicates(self._locate(predicate)[3])
+
+    def weaker(self, predicate: str) -> List[str]:
+        """
+        Corpus predicates implied by `predicate` but not equivalent to it.
+        """
+        return self._predicates(self._locate(predicate)[4])
+
+    def equivalent(self, predicate: str) -> List[str]:
+        node = self._locate(predicate)[2]
+        return list(self.members[node]) if node is not None else []
+
+    def hasse_diagram(self) -> Dict[str, List[str]]:
+        """
+        Covering edges of the order, from the first member of each node to the first members of
+        the closest weaker nodes.
+        """
+        return {members[0]: [self.members[child][0] for child in sorted(self.weaker_covers[node])]
+                for node, members in enumerate(self.members)}
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'predicates': len(self),
+            'nodes': len(self.members),
+            'edges': sum(len(children) for children in self.weaker_covers),
+            'comparisons': self.comparisons,
+            'inferred': self.inferred,
+            'pruned': self.pruned,
+        }
+
+    def _predicates(self, nodes: Set[int]) -> List[str]:
+        return [predicate for node in sorted(nodes) for predicate in self.members[node]]
+
+    def _locate(self, predicate: str) -> Tuple[ASTNode, Signature, Optional[int], Set[int], Set[int]]:
+        """
+        Place a predicate in the order without inserting it: its equivalent node (if any) and
+        the sets of strictly stronger and strictly weaker nodes.
+        """
+        ast = Parser(self.comparator.tokenizer.tokenize(predicate)).parse()
+        signature_ = signature(ast)
+        node = self._nodes.get(ast)
+        if node is not None:
+            return ast, signature_, node, self._closure(node, self.stronger_covers), self._closure(node, self.weaker_covers)
+
+        weaker_candidates = self._weaker_candidates(signature_)
+        stronger_candidates = self._stronger_candidates(signature_)
+        candidates = weaker_candidates | stronger_candidates
+        self.pruned += len(self.members) - len(candidates)
+
+        # node -> whether the predicate implies it / whether it implies the predicate
+        implies: Dict[int, bool] = {}
+        implied: Dict[int, bool] = {}
+        for node in sorted(candidates):
+            if (node not in weaker_candidates or node in implies) and (node not in stronger_candidates or node in implied):
+                self.inferred += 1
+                continue
+            verdict = self.comparator.compare(predicate, self.members[node][0])
+            self.comparisons += 1
+            forward = verdict in (FIRST_STRONGER_VERDICT, EQUIVALENT_VERDICT)
+            backward = verdict in (SECOND_STRONGER_VERDICT, EQUIVALENT_VERDICT)
+            if forward and backward:
+                return (ast, signature_, node,
+                        self._closure(node, self.stronger_covers), self._closure(node, self.weaker_covers))
+            if node not in implies:
+                self._spread(implies, node, forward, self.weaker_covers if forward else self.stronger_covers)
+            if node not in implied:
+                self._spread(implied, node, backward, self.stronger_covers if backward else self.weaker_covers)
+
+        stronger = {node for node, holds in implied.items() if holds}
+        weaker = {node for node, holds in implies.items() if holds}
+        return ast, signature_, None, stronger, weaker
+
+    def _weaker_candidates(self, signature_: Signature) -> Set[int]:
+        # Nodes all of whose required names the predicate mentions
+        counts = Counter()
+        for name in signature_.symbols:
+            counts.update(self._requiring.get(name, ()))
+        candidates = {node for node, count in counts.items() if count == len(self.signatures[node].required_symbols)}
+        candidates |= self._unconstrained
+        return {node for node in candidates if may_imply(signature_, self.signatures[node])}
+
+    def _stronger_candidates(self, signature_: Signature) -> Set[int]:
+        # Nodes that mention every name the predicate requires
+        if not signature_.required_symbols:
+            candidates = set(range(len(self.members)))
+        else:
+            postings = sorted((self._mentioning.get(name, set()) for name in signature_.required_symbols), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+        return {node for node in candidates if may_imply(self.signatures[node], signature_)}
+
+    @staticmethod
+    def _spread(facts: Dict[int, bool], start: int, value: bool, covers: List[Set[int]]) -> None:
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            if node in facts:
+                continue
+            facts[node] = value
+            stack.extend(covers[node])
+
+    @staticmethod
+    def _closure(start: int, covers: List[Set[int]]) -> Set[int]:
+        reached = set()
+        stack = list(covers[start])
+        while stack:
+            node = stack.pop()
+            if node not in reached:
+                reached.add(node)
+                stack.extend(covers[node])
+        return reached
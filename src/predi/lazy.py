@@ -0,0 +1,38 @@
+import importlib
+import sys
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule(ModuleType):
+    """
+    Stand-in for a heavy module (sympy, z3) that is only imported on first attribute access.
+
+    Once loaded, the module namespace is copied onto the stand-in, so later lookups such as
+    `sp.Symbol` are plain attribute reads rather than `__getattr__` calls.
+    """
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_module'] = None
+
+    def _load(self) -> ModuleType:
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, name: str) -> Any:
+        module = self.__dict__['_module'] or self._load()
+        return getattr(module, name)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Return module `name` if it is already imported, or a LazyModule that imports it on first use.
+    """
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
+
+
+def is_loaded(name: str) -> bool:
+    return name in sys.modules
@@ -1,23 +1,189 @@
-from typing import List, Tuple
+import weakref
+from typing import Iterable, List, Tuple
 from predi.config import debug_print
 
 
 class ASTNode:
-    def __init__(self, value: str, children: List['ASTNode'] = None):
-        self.value = value
-        self.children = children if children is not None else []
+    """
+    Immutable, hash-consed parse tree node.
+
+    Nodes are interned: constructing a node whose value and children equal those of a live
+    node returns that node, so structurally equal subtrees (`msg.sender`, `balances[]`, ...)
+    are shared and compare by identity. The structural hash is computed once, at
+    construction, which makes nodes cheap dictionary keys. `children` is a tuple.
+    """
+    __slots__ = ('value', 'children', '_hash', '__weakref__')
+
+    _interned: 'weakref.WeakValueDictionary[tuple, ASTNode]' = weakref.WeakValueDictionary()
+
+    def __new__(cls, value: str, children: Iterable['ASTNode'] = None):
+        children = tuple(children) if children is not None else ()
+        key = (value, children)
+        node = cls._interned.get(key)
+        if node is None:
+            node = super().__new__(cls)
+            object.__setattr__(node, 'value', value)
+            object.__setattr__(node, 'children', children)
+            object.__setattr__(node, '_hash', hash(key))
+            node = cls._interned.setdefault(key, node)
+        return node
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __hash__(self):
+        return self._hash
+
+    # Interning makes identity equality structural equality
+    def __eq__(self, other):
+        return self is other
+
+    def __ne__(self, other):
+        return self is not other
+
+    def __reduce__(self):
+        return ASTNode, (self.value, self.children)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __repr__(self):
-        return f"ASTNode(value='{self.value}', children={self.children})"
+        return f"ASTNode(value='{self.value}', children={list(self.children)})"
+
+# Binary operators by token tag, mapped to their binding power; all are left-associative
+BINARY_PRECEDENCE = {
+    'AND': 1, 'OR': 1,
+    'EQUAL': 2, 'NOT_EQUAL': 2,
+    'GREATER': 3, 'LESS': 3, 'GREATER_EQUAL': 3, 'LESS_EQUAL': 3,
+    'PLUS': 4, 'MINUS': 4,
+    'MULTIPLY': 5, 'DIVIDE': 5, 'MODULUS': 5,
+}
+# Prefix operators bind tighter than any binary operator
+PREFIX_PRECEDENCE = 6
+PREFIX_OPERATORS = {'NOT': '!', 'PLUS': '+', 'MINUS': '-'}
+
+LITERALS = ('TRUE', 'FALSE', 'ADDRESS_LITERAL', 'BYTES_LITERAL')
+OPERANDS = ('IDENTIFIER', 'MSG_SENDER', 'MSG_ORIGIN', 'INTEGER', 'FLOAT', 'SCIENTIFIC')
+POSTFIX = ('DOT', 'LBRACKET', 'LPAREN')
+
+# Frames of the operator stack: operators waiting for their right operand, and the open
+# groups whose inner expression is being parsed
+_BINARY, _PREFIX, _GROUP, _INDEX, _CALL = range(5)
+
 
 class Parser:
+    """
+    Iterative operator-precedence parser.
+
+    Produces the same trees as RecursiveDescentParser, but keeps pending operators and open
+    parentheses, index accesses and call argument lists on an explicit stack, so the nesting
+    depth of a predicate is not bounded by the Python recursion limit. As in the recursive
+    grammar, postfix accesses only follow identifiers and tokens after a complete top-level
+    expression are ignored.
+    """
     def __init__(self, tokens: List[Tuple[str, str]]):
         self.tokens = tokens
         self.position = 0
 
     def parse(self) -> ASTNode:
         self.position = 0  # Reset the position for each new parse
-        return self.expression()
+        tokens = self.tokens
+        length = len(tokens)
+        operands: List[ASTNode] = []
+        # (frame kind, operator or base node, precedence or call arguments)
+        frames: List[tuple] = []
+
+        while True:
+            # Operand position: prefix operators and opening parentheses, then a primary
+            while True:
+                if self.position >= length:
+                    raise ValueError("Unexpected end of input")
+                value, tag = tokens[self.position]
+                if tag in PREFIX_OPERATORS:
+                    frames.append((_PREFIX, PREFIX_OPERATORS[tag], PREFIX_PRECEDENCE))
+                elif tag == 'LPAREN':
+                    frames.append((_GROUP, None, 0))
+                else:
+                    break
+                self.position += 1
+            if tag in LITERALS:
+                operands.append(ASTNode(value))
+                postfix = False
+            elif tag in OPERANDS:
+                operands.append(ASTNode(value))
+                postfix = True
+            else:
+                raise ValueError(f"Unexpected token {tag} at position {self.position}")
+            self.position += 1
+
+            # Operator position: postfix accesses, binary operators, or the end of an expression
+            while True:
+                tag = tokens[self.position][1] if self.position < length else None
+                if postfix and tag in POSTFIX:
+                    self.position += 1
+                    node = operands.pop()
+                    if tag == 'DOT':
+                        member_token = self.consume('IDENTIFIER')
+                        operands.append(ASTNode(f"{node.value}.{member_token[0]}"))
+                        continue
+                    if tag == 'LBRACKET':
+                        frames.append((_INDEX, node, 0))
+                        break
+                    if self.position < length and tokens[self.position][1] != 'RPAREN':
+                        frames.append((_CALL, node, []))
+                        break
+                    self.consume('RPAREN')
+                    operands.append(ASTNode(f"{node.value}()"))
+                    continue
+
+                precedence = BINARY_PRECEDENCE.get(tag, 0)
+                self._reduce(operands, frames, precedence)
+                if precedence:
+                    frames.append((_BINARY, tokens[self.position][0], precedence))
+                    self.position += 1
+                    break
+
+                # The innermost expression ends here; close the group it belongs to
+                if not frames:
+                    return operands.pop()
+                kind, node, args = frames.pop()
+                if kind == _GROUP:
+                    self.consume('RPAREN')
+                    postfix = False
+                elif kind == _INDEX:
+                    self.consume('RBRACKET')
+                    operands.append(ASTNode(f"{node.value}[]", [operands.pop()]))
+                    postfix = True
+                else:
+                    args.append(operands.pop())
+                    if tag == 'COMMA':
+                        self.position += 1
+                    if self.position < length and tokens[self.position][1] != 'RPAREN':
+                        frames.append((_CALL, node, args))
+                        break
+                    self.consume('RPAREN')
+                    operands.append(ASTNode(f"{node.value}()", args))
+                    postfix = True
+
+    @staticmethod
+    def _reduce(operands: List[ASTNode], frames: List[tuple], precedence: int) -> None:
+        """
+        Apply the pending operators that bind at least as tightly as `precedence`,
+        down to the innermost open group.
+        """
+        while frames and frames[-1][0] <= _PREFIX and frames[-1][2] >= precedence:
+            kind, operator, _ = frames.pop()
+            if kind == _PREFIX:
+                operands.append(ASTNode(operator, [operands.pop()]))
+            else:
+                right = operands.pop()
+                operands.append(ASTNode(operator, [operands.pop(), right]))
 
     def consume(self, expected_tag: str) -> Tuple[str, str]:
         if self.position >= len(self.tokens):
@@ -28,6 +194,16 @@ class Parser:
         self.position += 1
         return token
 
+
+class RecursiveDescentParser(Parser):
+    """
+    The reference recursive-descent grammar, one method per precedence level. It needs
+    several Python frames per nesting level; Parser is the iterative equivalent.
+    """
+    def parse(self) -> ASTNode:
+        self.position = 0  # Reset the position for each new parse
+        return self.expression()
+
     def expression(self) -> ASTNode:
         node = self.logical_term()
         #debug_print(f"Parsed term: {node}")
@@ -0,0 +1,147 @@
+import random
+from typing import Callable, Dict, List, Optional, Tuple
+import sympy as sp
+from sympy.core.function import AppliedUndef
+import numpy as np
+from predi.cache import LRUCache
+
+
+# Values every numeric variable is tried with: Solidity integers are mostly uint256
+BOUNDARY_VALUES = (0, 1, 2, 2 ** 256 - 1)
+# Magnitudes the random values of a variable are drawn from
+SCALES = (10, 1000, 2 ** 32, 2 ** 256)
+# Values a variable used as a condition (`!paused`, `a > b && paused`) takes
+BOOLEAN_VALUES = (0, 1)
+# `true` and `false` become symbols when predicates are converted to SymPy
+LITERALS = {sp.Symbol('true'): sp.Integer(1), sp.Symbol('false'): sp.Integer(0)}
+
+POOL_SIZE = 64
+
+
+class Evaluator:
+    """
+    A predicate compiled with lambdify into a NumPy function of its variables. Calls and index
+    accesses (uninterpreted functions) are evaluated as opaque variables of their own; their
+    arguments are variables too, so that calls on equal arguments can be given equal values.
+    """
+    def __init__(self, expr):
+        applications = {application: sp.Symbol(f'__app_{application}') for application in expr.atoms(AppliedUndef)}
+        self.expr = expr.xreplace(LITERALS).xreplace(applications)
+        # (nesting depth, variable, function, arguments in terms of the variables) of every call
+        self.applications: List[Tuple[int, sp.Symbol, type, Tuple]] = [
+            (len(application.atoms(AppliedUndef)), symbol, application.func,
+             tuple(arg.xreplace(LITERALS).xreplace(applications) for arg in application.args))
+            for application, symbol in applications.items()]
+        variables = set(self.expr.free_symbols)
+        for _, _, _, args in self.applications:
+            variables.update(*(arg.free_symbols for arg in args))
+        self.variables: List[sp.Symbol] = sorted(variables, key=str)
+        self.boolean = {variable for variable in self.variables if _used_as_condition(self.expr, variable)}
+        self.function: Callable = sp.lambdify(self.variables, self.expr, 'numpy')
+
+    def __call__(self, columns: Dict[sp.Symbol, 'np.ndarray'], size: int) -> 'np.ndarray':
+        values = self.function(*(columns[variable] for variable in self.variables))
+        return np.broadcast_to(np.asarray(values, dtype=bool), (size,))
+
+    def holds(self, assignment: Dict[sp.Symbol, int]) -> bool:
+        """
+        Evaluate the predicate exactly at one point.
+        """
+        return bool(self.expr.xreplace({variable: sp.Integer(assignment[variable]) for variable in self.variables}))
+
+
+def _used_as_condition(expr, variable) -> bool:
+    for node in sp.preorder_traversal(expr):
+        if isinstance(node, (sp.And, sp.Or, sp.Not)) and variable in node.args:
+            return True
+    return expr == variable
+
+
+class Refuter:
+    """
+    Random-evaluation refutation of implications.
+
+    `refute(premise, conclusion)` evaluates both SymPy predicates on batches of random
+    non-negative integer assignments (including the boundary values 0, 1, 2 and 2^256-1),
+    looking for a point where the premise holds and the conclusion does not. The search runs
+    in floating point; a candidate point is only reported after it has been confirmed by
+    exact evaluation. A counterexample disproves the implication; finding none proves nothing.
+    For predicates that cannot be compiled, nothing is refuted.
+    """
+    def __init__(self, samples: int = 4096, batches: int = 1, seed: int = 0, cache_size: int = 1024):
+        self.samples = samples
+        self.batches = batches
+        self.seed = seed
+        self.evaluators = LRUCache(cache_size)
+
+    def refute(self, premise, conclusion) -> Optional[Dict[str, int]]:
+        """
+        Return an assignment (variable name to value) under which `premise` holds and
+        `conclusion` does not, or None.
+        """
+        try:
+            evaluators = (self._evaluator(premise), self._evaluator(conclusion))
+        except Exception:
+            return None
+        variables = sorted(set(evaluators[0].variables) | set(evaluators[1].variables), key=str)
+        boolean = evaluators[0].boolean | evaluators[1].boolean
+        # Seeded per query, so the same pair is always searched with the same points
+        rng = random.Random(f'{self.seed}:{premise}:{conclusion}')
+        indices = np.random.default_rng(rng.getrandbits(64))
+        pools = {variable: self._pool(rng, variable in boolean) for variable in variables}
+
+        for _ in range(self.batches):
+            choices = {variable: indices.integers(0, len(pool[0]), self.samples) for variable, pool in pools.items()}
+            columns = {variable: pools[variable][1][choice] for variable, choice in choices.items()}
+            try:
+                with np.errstate(all='ignore'):
+                    candidates = evaluators[0](columns, self.samples) & ~evaluators[1](columns, self.samples)
+            except Exception:
+                return None
+            for index in np.flatnonzero(candidates)[:8]:
+                assignment = self._congruent(evaluators, {variable: pools[variable][0][choices[variable][index]]
+                                                          for variable in variables})
+                if assignment is not None and self._confirm(evaluators, assignment):
+                    return {str(variable).replace('__app_', '', 1): value for variable, value in assignment.items()}
+        return None
+
+    def _evaluator(self, expr) -> Evaluator:
+        return self.evaluators.get_or_compute(expr, lambda: Evaluator(expr))
+
+    @staticmethod
+    def _pool(rng: random.Random, boolean: bool) -> Tuple[List[int], 'np.ndarray']:
+        if boolean:
+            values = list(BOOLEAN_VALUES)
+        else:
+            values = list(BOUNDARY_VALUES)
+            while len(values) < POOL_SIZE:
+                values.append(rng.randrange(rng.choice(SCALES)))
+        # Exact values, and their floating point approximations for the vectorized search
+        return values, np.array([float(value) for value in values])
+
+    @staticmethod
+    def _congruent(evaluators: Tuple[Evaluator, Evaluator], assignment: Dict[sp.Symbol, int]) -> Optional[Dict[sp.Symbol, int]]:
+        """
+        The assignment with every call given the value of the first call of the same function
+        on equal arguments, innermost calls first, so that it is a consistent interpretation of
+        the functions; None if an argument cannot be evaluated.
+        """
+        applications = sorted({application for evaluator in evaluators for application in evaluator.applications},
+                              key=lambda application: (application[0], str(application[1])))
+        assignment = dict(assignment)
+        values = {}
+        try:
+            for _, variable, func, args in applications:
+                key = (func, tuple(sp.expand(arg.xreplace({symbol: sp.Integer(assignment[symbol]) for symbol in arg.free_symbols}))
+                                   for arg in args))
+                assignment[variable] = values.setdefault(key, assignment[variable])
+        except Exception:
+            return None
+        return assignment
+
+    @staticmethod
+    def _confirm(evaluators: Tuple[Evaluator, Evaluator], assignment: Dict[sp.Symbol, int]) -> bool:
+        try:
+            return evaluators[0].holds(assignment) and not evaluators[1].holds(assignment)
+        except Exception:
+            return False
@@ -0,0 +1,209 @@
+import argparse
+import csv
+import json
+import math
+import mmap
+import os
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional
+from predi.comparator import ComparisonResult, FAST_PATHS, Verdict
+
+
+FORMAT_VERSION = 1
+# Column name to array typecode: row index, verdict code, wall time in seconds (NaN when
+# unknown), and fast path code (0 for none, else 1 + position in FAST_PATHS)
+COLUMNS = {'index': 'q', 'verdict': 'B', 'seconds': 'f', 'fast_path': 'B'}
+# Rows buffered per column before they are appended to the column files
+BUFFER_ROWS = 65536
+
+FAST_PATH_CODES = {fast_path: code for code, fast_path in enumerate((None,) + FAST_PATHS)}
+
+
+class StoredResult(NamedTuple):
+    index: int
+    verdict: Verdict
+    seconds: Optional[float]
+    fast_path: Optional[str]
+
+
+class ResultWriter:
+    """
+    Writes comparison results as a columnar result store: a directory with one file of
+    fixed-width values per column (see COLUMNS) and a `meta.json` describing them. Rows are
+    appended as they come, so a batch of any size is written in constant memory; the store
+    is complete once the writer is closed.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        os.makedirs(path, exist_ok=True)
+        self._files = {name: open(os.path.join(path, f'{name}.bin'), 'wb') for name in COLUMNS}
+        self._buffers = {name: array(typecode) for name, typecode in COLUMNS.items()}
+
+    def write(self, result: ComparisonResult) -> None:
+        self._buffers['index'].append(result.index)
+        self._buffers['verdict'].append(Verdict.of(result.verdict))
+        self._buffers['seconds'].append(math.nan if result.seconds is None else result.seconds)
+        self._buffers['fast_path'].append(FAST_PATH_CODES[result.fast_path])
+        self.rows += 1
+        if len(self._buffers['index']) >= BUFFER_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        for name, buffer in self._buffers.items():
+            buffer.tofile(self._files[name])
+            del buffer[:]
+
+    def close(self) -> None:
+        if self._files is None:
+            return
+        self._flush()
+        for file in self._files.values():
+            file.close()
+        self._files = None
+        meta = {
+            'version': FORMAT_VERSION,
+            'rows': self.rows,
+            'byteorder': sys.byteorder,
+            'columns': COLUMNS,
+            'verdicts': {code.name: code.value for code in Verdict},
+            'fast_paths': list(FAST_PATHS),
+        }
+        with open(os.path.join(self.path, 'meta.json'), 'w') as file:
+            json.dump(meta, file, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_results(results: Iterable[ComparisonResult], path: str) -> int:
+    """
+    Write results to a columnar store at `path`, returning the number of rows.
+    """
+    with ResultWriter(path) as writer:
+        for result in results:
+            writer.write(result)
+    return writer.rows
+
+
+class ResultStore:
+    """
+    Read-only view of a columnar result store. The column files are memory-mapped, so opening
+    a store of any size is immediate; `column` exposes a column as a typed memoryview (which
+    `numpy.frombuffer` accepts without copying), and the aggregates count codes without
+    decoding rows.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as file:
+            meta = json.load(file)
+        if meta['version'] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported result store version: {meta['version']}")
+        if meta['byteorder'] != sys.byteorder:
+            raise ValueError(f"Result store was written on a {meta['byteorder']}-endian machine")
+        self.rows: int = meta['rows']
+        self.fast_paths = (None,) + tuple(meta['fast_paths'])
+        self._maps = []
+        self._columns: Dict[str, memoryview] = {}
+        for name, typecode in meta['columns'].items():
+            self._columns[name] = self._map(os.path.join(path, f'{name}.bin'), typecode)
+
+    def _map(self, filename: str, typecode: str) -> memoryview:
+        with open(filename, 'rb') as file:
+            # Validated before mapping: a truncated file must not pass for a shorter store
+            size = os.fstat(file.fileno()).st_size
+            if size != self.rows * array(typecode).itemsize:
+                raise ValueError(f"Column file {filename} holds {size} bytes, expected {self.rows} rows")
+            if size == 0:
+                # An empty file cannot be mapped
+                return memoryview(b'').cast(typecode)
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return memoryview(mapped).cast(typecode)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str) -> memoryview:
+        return self._columns[name]
+
+    def __getitem__(self, row: int) -> StoredResult:
+        seconds = self._columns['seconds'][row]
+        return StoredResult(self._columns['index'][row], Verdict(self._columns['verdict'][row]),
+                            None if math.isnan(seconds) else seconds, self.fast_paths[self._columns['fast_path'][row]])
+
+    def __iter__(self) -> Iterator[StoredResult]:
+        return (self[row] for row in range(self.rows))
+
+    def verdict_counts(self) -> Dict[Verdict, int]:
+        codes = self._columns['verdict'].tobytes()
+        return {verdict: codes.count(verdict) for verdict in Verdict}
+
+    def fast_path_counts(self) -> Dict[Optional[str], int]:
+        codes = self._columns['fast_path'].tobytes()
+        return {fast_path: codes.count(code) for code, fast_path in enumerate(self.fast_paths)}
+
+    def to_csv(self, output_file: Optional[str] = None, pairs: Optional[Iterable] = None) -> None:
+        """
+        Convert the store to CSV (on `output_file`, or stdout). Given the compared `pairs` in
+        input order, the predicates are written as well.
+        """
+        pairs = iter(pairs) if pairs is not None else None
+        fields = ['index'] + (['predicate', 'diversified_predicate'] if pairs is not None else []) + \
+            ['result', 'seconds', 'fast_path']
+        csvfile = open(output_file, 'w', newline='') if output_file else sys.stdout
+        try:
+            writer = csv.writer(csvfile)
+            writer.writerow(fields)
+            for result in self:
+                row = [result.index]
+                if pairs is not None:
+                    row.extend(next(pairs))
+                row += [result.verdict.text or '', '' if result.seconds is None else f'{result.seconds:.6f}',
+                        result.fast_path or '']
+                writer.writerow(row)
+        finally:
+            if output_file:
+                csvfile.close()
+
+    def close(self) -> None:
+        # Views must be released before their maps can be closed
+        for view in self._columns.values():
+            view.release()
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inspect a columnar result store written by `predi.batch --store`.')
+    parser.add_argument('store', help='result store directory')
+    parser.add_argument('--csv', action='store_true', help='convert the store to CSV instead of summarizing it')
+    parser.add_argument('-o', '--output', help='CSV file to write (default: stdout)')
+    parser.add_argument('-p', '--pairs', help='CSV file of the compared pairs, to include the predicates in the CSV')
+    args = parser.parse_args(argv)
+
+    with ResultStore(args.store) as store:
+        if args.csv:
+            from predi.batch import load_pairs
+            store.to_csv(args.output, load_pairs(args.pairs) if args.pairs else None)
+            return
+        print(f"Rows: {len(store)}")
+        for verdict, count in store.verdict_counts().items():
+            print(f"{verdict.name}: {count}")
+        for fast_path, count in store.fast_path_counts().items():
+            print(f"Fast path {fast_path or 'none'}: {count}")
+
+
+if __name__ == '__main__':
+    main()
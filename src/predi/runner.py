@@ -0,0 +1,246 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter, deque
+from multiprocessing.connection import wait
+from typing import Any, Deque, Dict, IO, Iterable, List, Optional, Set, Tuple
+from predi.batch import load_pairs
+from predi.comparator import Comparator, ComparisonResult
+
+
+# Outcome of a row: compared (possibly to TIMEOUT_VERDICT under a soft budget), raised an
+# exception, ran past the hard timeout and had its worker killed, or crashed its worker
+STATUSES = ('ok', 'error', 'timeout', 'crashed')
+
+# Seconds a worker gets to exit after being asked to, before it is killed
+SHUTDOWN_GRACE = 1.0
+
+Item = Tuple[int, Tuple[str, str]]
+
+
+def _worker_main(connection, comparator_class, options) -> None:
+    """
+    Body of a worker process: compare the shards sent over `connection`, sending back one
+    result per pair as soon as it is known, until None is received.
+    """
+    comparator = comparator_class(**options)
+    while True:
+        try:
+            shard = connection.recv()
+        except EOFError:
+            return
+        if shard is None:
+            return
+        for item in shard:
+            connection.send(comparator._compare_isolated(item))
+
+
+class _Worker:
+    """
+    One worker process of a DatasetRunner and the shard it is working through; the first
+    pair of `remaining` is the one being compared.
+    """
+    def __init__(self, context, comparator_class, options):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, comparator_class, options), daemon=True)
+        self.process.start()
+        child.close()
+        self.remaining: Deque[Item] = deque()
+        self.deadline: Optional[float] = None
+
+    def assign(self, shard: List[Item], timeout: float) -> None:
+        self.remaining = deque(shard)
+        self.deadline = time.monotonic() + timeout
+        self.connection.send(shard)
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+    def stop(self) -> None:
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(SHUTDOWN_GRACE)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+
+def read_outcomes(output_file: str) -> Dict[int, Dict[str, Any]]:
+    """
+    Outcomes recorded in a runner output file, by row index. A final line cut short by an
+    interruption is ignored.
+    """
+    outcomes = {}
+    with open(output_file, 'r') as file:
+        for line in file:
+            try:
+                outcome = json.loads(line)
+            except ValueError:
+                continue
+            outcomes[outcome['index']] = outcome
+    return outcomes
+
+
+def _open_checkpoint(output_file: str, resume: bool) -> Tuple[IO[str], Set[int]]:
+    if not resume or not os.path.exists(output_file):
+        return open(output_file, 'w'), set()
+    # Drop a partially written last line, so that new outcomes start on a line of their own
+    with open(output_file, 'rb+') as file:
+        data = file.read()
+        file.truncate(data.rfind(b'\n') + 1)
+    return open(output_file, 'a'), set(read_outcomes(output_file))
+
+
+class DatasetRunner:
+    """
+    Fault-isolated comparison of a dataset of predicate pairs.
+
+    The pairs are cut into shards of `shard_size` pairs that are handed out to `workers`
+    worker processes, each with its own Comparator. Every pair is bounded by a hard
+    `timeout`: a worker that does not report a pair in time is killed and replaced, and so is
+    a worker that crashes (a segfault in Z3, running out of memory). The pair is recorded as
+    `timeout` or `crashed` and the rest of its shard is handed out again, so one bad pair
+    never stalls or aborts the run. This complements the comparator's own time budget, which
+    degrades to cheaper tiers but cannot interrupt native code.
+
+    One JSON line per pair is appended to the output file as soon as the pair is decided; the
+    file is the checkpoint, and a run started on an existing file only compares the pairs it
+    has no outcome for yet.
+    """
+    def __init__(self, comparator: Optional[Comparator] = None, workers: Optional[int] = None,
+                 timeout: float = 60.0, shard_size: int = 64):
+        if timeout <= 0:
+            raise ValueError("The hard timeout must be a positive number of seconds")
+        self.comparator = comparator if comparator is not None else Comparator()
+        self.workers = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.shard_size = max(1, shard_size)
+        self.counts: Counter = Counter()
+        self._context = multiprocessing.get_context()
+
+    def run(self, pairs: Iterable[Tuple[str, str]], output_file: str, resume: bool = True) -> Counter:
+        """
+        Compare the pairs, appending their outcomes to `output_file`. With `resume`, pairs that
+        already have an outcome in the file are skipped; otherwise the file is overwritten.
+        Returns the number of pairs compared in this run, by status.
+        """
+        self.counts = Counter()
+        output, done = _open_checkpoint(output_file, resume)
+        items = [item for item in enumerate(pairs) if item[0] not in done]
+        shards = deque(items[start:start + self.shard_size] for start in range(0, len(items), self.shard_size))
+        workers: List[Optional[_Worker]] = [None] * min(self.workers, len(shards))
+        try:
+            while shards or any(worker is not None and worker.remaining for worker in workers):
+                for slot, worker in enumerate(workers):
+                    if shards and (worker is None or not worker.remaining):
+                        if worker is None:
+                            worker = workers[slot] = self._spawn()
+                        worker.assign(shards.popleft(), self.timeout)
+                self._collect(workers, shards, output)
+        finally:
+            for worker in workers:
+                if worker is not None:
+                    if worker.remaining:
+                        worker.kill()
+                    else:
+                        worker.stop()
+            output.close()
+        return self.counts
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._context, type(self.comparator), self.comparator.options)
+
+    def _collect(self, workers: List[Optional[_Worker]], shards: Deque[List[Item]], output: IO[str]) -> None:
+        busy = {worker.connection: slot for slot, worker in enumerate(workers) if worker is not None and worker.remaining}
+        deadline = min(workers[slot].deadline for slot in busy.values())
+        for connection in wait(list(busy), max(0.0, deadline - time.monotonic())):
+            slot = busy[connection]
+            worker = workers[slot]
+            try:
+                result = connection.recv()
+            except (EOFError, OSError):
+                worker.kill()
+                self._abandon(worker, 'crashed', f"Worker exited with code {worker.process.exitcode}", shards, output)
+                workers[slot] = None
+                continue
+            worker.remaining.popleft()
+            worker.deadline = time.monotonic() + self.timeout
+            self._record(result, output)
+
+        now = time.monotonic()
+        for slot, worker in enumerate(workers):
+            if worker is not None and worker.remaining and worker.deadline <= now:
+                worker.kill()
+                self._abandon(worker, 'timeout', f"Comparison exceeded the hard timeout of {self.timeout:g}s",
+                              shards, output)
+                workers[slot] = None
+
+    def _abandon(self, worker: _Worker, status: str, error: str, shards: Deque[List[Item]], output: IO[str]) -> None:
+        # The pair in progress is the culprit; the rest of the shard is handed out again
+        index, (predicate1, predicate2) = worker.remaining.popleft()
+        self._write(output, {'index': index, 'predicate': predicate1, 'diversified_predicate': predicate2,
+                             'status': status, 'verdict': None, 'error': error, 'seconds': None, 'fast_path': None})
+        if worker.remaining:
+            shards.appendleft(list(worker.remaining))
+        worker.remaining = deque()
+
+    def _record(self, result: ComparisonResult, output: IO[str]) -> None:
+        self._write(output, {'index': result.index, 'predicate': result.predicate1,
+                             'diversified_predicate': result.predicate2,
+                             'status': 'ok' if result.error is None else 'error', 'verdict': result.verdict,
+                             'error': result.error, 'seconds': result.seconds, 'fast_path': result.fast_path})
+
+    def _write(self, output: IO[str], outcome: Dict[str, Any]) -> None:
+        output.write(json.dumps(outcome) + '\n')
+        output.flush()
+        self.counts[outcome['status']] += 1
+
+
+def run_dataset(input_file: str, output_file: str, comparator: Optional[Comparator] = None,
+                workers: Optional[int] = None, timeout: float = 60.0, shard_size: int = 64,
+                resume: bool = True) -> Counter:
+    """
+    Compare every pair of a CSV file with a DatasetRunner, recording one outcome per row in
+    the JSONL file `output_file`. Returns the number of pairs compared in this run, by status.
+    """
+    runner = DatasetRunner(comparator, workers, timeout, shard_size)
+    return runner.run(load_pairs(input_file), output_file, resume)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare the predicate pairs of a CSV file in killable worker processes, '
+                                                 'checkpointing the outcome of every row.')
+    parser.add_argument('input_file', help='CSV file with `predicate` and `diversified_predicate` columns')
+    parser.add_argument('-o', '--output', required=True, help='JSONL file of row outcomes, resumed if it exists')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes (default: one per core)')
+    parser.add_argument('-t', '--timeout', type=float, default=60.0,
+                        help='hard time limit of each pair, in seconds, after which its worker is killed')
+    parser.add_argument('-b', '--budget', type=float, default=None,
+                        help="the comparator's own time budget of each comparison, in seconds")
+    parser.add_argument('-n', '--shard-size', type=int, default=64, help='pairs handed to a worker at a time')
+    parser.add_argument('--fresh', action='store_true', help='overwrite the output file instead of resuming it')
+    parser.add_argument('--simplification', default='logic', choices=Comparator.simplification_levels,
+                        help='how thoroughly predicates are simplified (default: logic)')
+    args = parser.parse_args(argv)
+
+    comparator = Comparator(timeout=args.budget, simplification=args.simplification)
+    try:
+        counts = run_dataset(args.input_file, args.output, comparator, args.workers, args.timeout, args.shard_size,
+                             resume=not args.fresh)
+    except KeyboardInterrupt:
+        print("Interrupted; run again with the same output file to resume", file=sys.stderr)
+        sys.exit(130)
+    for status in STATUSES:
+        print(f"{status}: {counts[status]}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
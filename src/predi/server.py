@@ -0,0 +1,237 @@
+import argparse
+import io
+import json
+import os
+import socketserver
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, IO, Optional, Tuple
+from predi.comparator import Comparator
+
+
+# Comparator owned by each worker process of a ComparisonServer
+_worker_comparator = None
+
+
+def _init_worker(comparator_class, options):
+    global _worker_comparator
+    _worker_comparator = comparator_class(**options)
+
+
+def _compare_in_worker(predicate1: str, predicate2: str, timeout: Optional[float]) -> Tuple[Optional[str], Optional[str]]:
+    try:
+        return _worker_comparator.compare(predicate1, predicate2, timeout=timeout), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+class ComparisonServer:
+    """
+    Long-running comparison service speaking JSONL.
+
+    Each request line is `{"id": ..., "p1": ..., "p2": ...}`, optionally with a per-request
+    `timeout` in seconds, and is answered by one `{"id": ..., "verdict": ..., "error": ...}`
+    line. Requests are pipelined: a stream is read ahead while earlier requests are still
+    being compared, and responses are written in completion order, so clients match them by
+    `id`. Comparisons run on a pool of worker processes that each keep a warm Comparator
+    (imported backends, SymPy caches, prepared predicate cache) for the lifetime of the
+    server; `max_pending` bounds the requests in flight across all clients. A worker that
+    dies (a segfault in a solver, running out of memory) breaks the pool: the requests in
+    flight on it are answered with an error, and the pool is replaced by a fresh one.
+    """
+    def __init__(self, comparator: Optional[Comparator] = None, workers: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        comparator = comparator if comparator is not None else Comparator()
+        self.workers = workers or os.cpu_count() or 1
+        self._initargs = (type(comparator), comparator.options)
+        self._executor_lock = threading.Lock()
+        self._closed = False
+        self.executor = self._start_executor()
+        self.max_pending = max_pending or 4 * self.workers
+        self._pending = threading.BoundedSemaphore(self.max_pending)
+        self._unix_server = None
+
+    def submit(self, request: Dict[str, Any]) -> Future:
+        """
+        Schedule one decoded request, blocking while `max_pending` requests are in flight.
+        The future resolves to the response object.
+        """
+        self._pending.acquire()
+        try:
+            executor = self.executor
+            try:
+                future = executor.submit(_compare_in_worker, request['p1'], request['p2'], request.get('timeout'))
+            except BrokenProcessPool:
+                executor = self._replace_broken(executor)
+                future = executor.submit(_compare_in_worker, request['p1'], request['p2'], request.get('timeout'))
+        except BaseException:
+            self._pending.release()
+            raise
+        future.add_done_callback(lambda _: self._pending.release())
+        response = Future()
+
+        def respond(done: Future) -> None:
+            try:
+                verdict, error = done.result()
+            except Exception as e:
+                # The worker process died or the pool was shut down
+                if isinstance(e, BrokenProcessPool):
+                    self._replace_broken(executor)
+                verdict, error = None, f"{type(e).__name__}: {e}"
+            response.set_result({'id': request.get('id'), 'verdict': verdict, 'error': error})
+
+        future.add_done_callback(respond)
+        return response
+
+    def _start_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=self._initargs)
+
+    def _replace_broken(self, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """
+        Replace the pool `broken` by a fresh one, unless that already happened, and return the
+        current pool.
+        """
+        with self._executor_lock:
+            if self.executor is broken and not self._closed:
+                self.executor = self._start_executor()
+                broken.shutdown(wait=False)
+            return self.executor
+
+    def serve_stream(self, reader: IO[str], writer: IO[str]) -> int:
+        """
+        Answer every request line of `reader` on `writer` until end of input, then wait for
+        the outstanding responses. Returns the number of requests answered.
+        """
+        lock = threading.Lock()
+        idle = threading.Condition()
+        in_flight = 0
+        answered = 0
+
+        def write(response: Dict[str, Any]) -> None:
+            line = json.dumps(response) + '\n'
+            with lock:
+                try:
+                    writer.write(line)
+                    writer.flush()
+                except (OSError, ValueError):
+                    # The client went away; its remaining responses are dropped
+                    pass
+
+        def deliver(response: Future) -> None:
+            nonlocal in_flight
+            write(response.result())
+            with idle:
+                in_flight -= 1
+                idle.notify_all()
+
+        for line in reader:
+            if not line.strip():
+                continue
+            answered += 1
+            request, error = self._decode(line)
+            if error is not None:
+                write({'id': request.get('id'), 'verdict': None, 'error': error})
+                continue
+            try:
+                response = self.submit(request)
+            except RuntimeError as e:
+                # The pool is broken or shut down
+                write({'id': request.get('id'), 'verdict': None, 'error': f"{type(e).__name__}: {e}"})
+                continue
+            with idle:
+                in_flight += 1
+            response.add_done_callback(deliver)
+
+        # Wait until every response has been written, not merely computed
+        with idle:
+            idle.wait_for(lambda: in_flight == 0)
+        return answered
+
+    @staticmethod
+    def _decode(line: str) -> Tuple[Dict[str, Any], Optional[str]]:
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return {}, f"Invalid JSON: {e}"
+        if not isinstance(request, dict):
+            return {}, "Invalid request: expected a JSON object"
+        for key in ('p1', 'p2'):
+            if not isinstance(request.get(key), str):
+                return request, f"Invalid request: `{key}` must be a string"
+        timeout = request.get('timeout')
+        if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0):
+            return request, "Invalid request: `timeout` must be a positive number of seconds"
+        return request, None
+
+    def serve_unix(self, path: str) -> None:
+        """
+        Accept clients on the Unix socket `path`, one thread per connection, until interrupted
+        or `shutdown` is called.
+        """
+        server = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                reader = io.TextIOWrapper(self.rfile, encoding='utf-8')
+                writer = io.TextIOWrapper(self.wfile, encoding='utf-8', write_through=True)
+                server.serve_stream(reader, writer)
+
+        if os.path.exists(path):
+            os.unlink(path)
+        with socketserver.ThreadingUnixStreamServer(path, Handler) as unix_server:
+            unix_server.daemon_threads = True
+            self._unix_server = unix_server
+            try:
+                unix_server.serve_forever()
+            finally:
+                self._unix_server = None
+                os.unlink(path)
+
+    def shutdown(self) -> None:
+        """
+        Stop a running `serve_unix` loop; may be called from any other thread.
+        """
+        if self._unix_server is not None:
+            self._unix_server.shutdown()
+
+    def close(self) -> None:
+        with self._executor_lock:
+            self._closed = True
+            executor = self.executor
+        executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve predicate comparisons as JSONL over stdin/stdout or a Unix socket.')
+    parser.add_argument('-s', '--socket', help='Unix socket to listen on (default: serve stdin/stdout)')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='number of worker processes (default: one per core)')
+    parser.add_argument('-p', '--max-pending', type=int, default=None, help='requests in flight at a time (default: 4 per worker)')
+    parser.add_argument('-t', '--timeout', type=float, default=None, help='default time budget of each comparison, in seconds')
+    parser.add_argument('--cache-size', type=int, default=1024, help='prepared predicates cached by each worker')
+    parser.add_argument('--backend', default='sympy', choices=Comparator.backends)
+    parser.add_argument('--simplification', default='logic', choices=Comparator.simplification_levels,
+                        help='how thoroughly predicates are simplified (default: logic)')
+    args = parser.parse_args(argv)
+
+    comparator = Comparator(cache_size=args.cache_size, backend=args.backend, timeout=args.timeout,
+                            simplification=args.simplification)
+    with ComparisonServer(comparator, args.workers, args.max_pending) as server:
+        try:
+            if args.socket:
+                server.serve_unix(args.socket)
+            else:
+                server.serve_stream(sys.stdin, sys.stdout)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,27 @@
 import sympy as sp
+from sympy.core.relational import Relational
+from sympy.logic.boolalg import BooleanAtom, simplify_logic
 from typing import Union
 from predi.parser import ASTNode
 from predi.config import debug_print
 
+
+# Simplification levels, from cheapest to most thorough
+LEVELS = ('none', 'structural', 'logic', 'full')
+# `true` and `false` are plain symbols in converted predicates (`used[salt] == false`)
+LITERAL_SYMBOLS = (sp.Symbol('true'), sp.Symbol('false'))
+# simplify_logic gives up on Boolean skeletons with more atoms than this
+LOGIC_ATOMS = 8
+# Relation `d <op> 0` in terms of the sign atoms `d > 0` and `d < 0`
+SIGN_ENCODINGS = {
+    sp.StrictGreaterThan: lambda positive, negative: positive,
+    sp.StrictLessThan: lambda positive, negative: negative,
+    sp.GreaterThan: lambda positive, negative: sp.Not(negative),
+    sp.LessThan: lambda positive, negative: sp.Not(positive),
+    sp.Equality: lambda positive, negative: sp.And(sp.Not(positive), sp.Not(negative)),
+    sp.Unequality: lambda positive, negative: sp.Or(positive, negative),
+}
+
 class Simplifier:
     def __init__(self):
         self.symbols = {
@@ -19,16 +38,160 @@ class Simplifier:
             '!': sp.Not
         }
 
-    def simplify(self, ast: ASTNode) -> Union[str, ASTNode]:
+    def simplify(self, ast: ASTNode, level: str = 'full') -> Union[str, ASTNode]:
         #debug_print(f"Simplifying AST: {ast}")
         sympy_expr = self._to_sympy(ast)
         #debug_print(f"Converted to sympy expression: {sympy_expr}")
-        simplified_expr = sp.simplify(sympy_expr)
+        simplified_expr = self.simplify_expr(sympy_expr, level)
         #debug_print(f"Simplified sympy expression: {simplified_expr}")
         simplified_ast = self._to_ast(simplified_expr)
         #debug_print(f"Converted back to AST: {simplified_ast}")
         return simplified_ast
 
+    def simplify_expr(self, expr, level: str = 'full'):
+        """
+        Simplify a SymPy predicate at one of LEVELS:
+
+        - `none` keeps the expression as built (SymPy already flattens And/Or and folds
+          numbers on construction);
+        - `structural` also moves the terms of every relation to the side where they are
+          positive, with the constant on the right and common factors divided out, and
+          orients it canonically (`b > a` and `a - b < 0` both become `a < b`);
+        - `logic` also minimizes the Boolean skeleton with `simplify_logic`, keeping the
+          relations opaque atoms (skeletons of more than LOGIC_ATOMS atoms are left alone);
+        - `full` runs `sp.simplify`, which is far slower.
+        """
+        if level == 'none':
+            return expr
+        if level == 'full':
+            return sp.simplify(expr)
+        if level not in LEVELS:
+            raise ValueError(f"Unknown simplification level: {level}, expected one of {LEVELS}")
+        expr = self._structural(expr)
+        if level == 'logic':
+            expr = self._simplify_skeleton(expr)
+        return expr
+
+    def _structural(self, expr):
+        if isinstance(expr, Relational):
+            return self._orient(expr)
+        if isinstance(expr, (sp.And, sp.Or, sp.Not)):
+            return expr.func(*[self._structural(arg) for arg in expr.args])
+        return expr
+
+    @staticmethod
+    def _orient(relation):
+        lhs, rhs = relation.lhs, relation.rhs
+        if not (isinstance(lhs, sp.Expr) and isinstance(rhs, sp.Expr)) or lhs in LITERAL_SYMBOLS or rhs in LITERAL_SYMBOLS:
+            return relation
+        difference = lhs - rhs
+        if difference.is_Number:
+            return relation.func(difference, 0)
+        content, difference = difference.as_content_primitive()
+        constant, terms = difference.as_coeff_Add()
+        positive = [term for term in sp.Add.make_args(terms) if not term.could_extract_minus_sign()]
+        negative = [-term for term in sp.Add.make_args(terms) if term.could_extract_minus_sign()]
+        if not positive:
+            # Only negative terms: negate both sides and mirror the relation
+            relation = relation.reversed
+            positive, negative, constant = negative, [], -constant
+        return relation.func(sp.Add(*positive), sp.Add(*negative) - constant).canonical
+
+    @classmethod
+    def _simplify_skeleton(cls, expr):
+        if not isinstance(expr, (sp.And, sp.Or, sp.Not)):
+            return expr
+        # Relations become combinations of the sign atoms `d > 0` and `d < 0` of the difference
+        # `d` of their sides, so complementary and covering relations over the same operands
+        # (`a != b` and `a < b || a > b`, `!(a < b)` and `a >= b`) share atoms; calls and other
+        # atoms become opaque Boolean variables
+        atoms = {}
+        signs = {}
+
+        def sign(difference, positive):
+            return atoms.setdefault((difference, positive), sp.Dummy())
+
+        def skeleton(node):
+            if isinstance(node, (sp.And, sp.Or, sp.Not)):
+                return node.func(*[skeleton(arg) for arg in node.args])
+            if isinstance(node, (sp.Symbol, BooleanAtom)):
+                return node
+            difference = cls._difference(node)
+            if difference is None:
+                return atoms.setdefault(node, sp.Dummy())
+            relation = node.func
+            if difference.could_extract_minus_sign():
+                difference = -difference
+                relation = node.reversed.func
+            positive, negative = sign(difference, True), sign(difference, False)
+            signs[difference] = (positive, negative)
+            return SIGN_ENCODINGS[relation](positive, negative)
+
+        boolean = skeleton(expr)
+        if len(boolean.free_symbols) > LOGIC_ATOMS:
+            return expr
+        # A difference is never both positive and negative
+        impossible = sp.Or(*[sp.And(positive, negative) for positive, negative in signs.values()])
+        simplified = simplify_logic(boolean, dontcare=impossible if signs else None)
+        restored = cls._restore(simplified, {dummy: atom for atom, dummy in atoms.items()}, signs)
+        if sp.count_ops(restored) >= sp.count_ops(expr):
+            return expr
+        return restored
+
+    @staticmethod
+    def _difference(relation):
+        """
+        Difference of the sides of a numeric relation, or None for anything else.
+        """
+        if not isinstance(relation, Relational):
+            return None
+        lhs, rhs = relation.lhs, relation.rhs
+        if not (isinstance(lhs, sp.Expr) and isinstance(rhs, sp.Expr)) or lhs in LITERAL_SYMBOLS or rhs in LITERAL_SYMBOLS:
+            return None
+        difference = sp.expand(lhs - rhs)
+        return None if difference.is_Number else difference
+
+    @classmethod
+    def _restore(cls, boolean, atoms, signs):
+        """
+        Map a minimized skeleton back to relations, folding `d > 0 || d < 0` into `d != 0`
+        and `!(d > 0) && !(d < 0)` into `d == 0`.
+        """
+        literals = {}
+        for difference, (positive, negative) in signs.items():
+            literals[positive] = (difference, True)
+            literals[negative] = (difference, False)
+
+        def restore(node):
+            if node in literals:
+                difference, positive = literals[node]
+                return cls._orient((sp.Gt if positive else sp.Lt)(difference, 0))
+            if isinstance(node, sp.Not) and node.args[0] in literals:
+                difference, positive = literals[node.args[0]]
+                return cls._orient((sp.Le if positive else sp.Ge)(difference, 0))
+            if isinstance(node, (sp.And, sp.Or)):
+                # Pairs of sign literals of one difference: both true in an Or, both false in an And
+                negated = isinstance(node, sp.And)
+                pending, args = {}, []
+                for arg in node.args:
+                    literal = arg.args[0] if negated and isinstance(arg, sp.Not) else (None if negated else arg)
+                    if literal in literals:
+                        difference, positive = literals[literal]
+                        if (difference, not positive) in pending:
+                            del pending[(difference, not positive)]
+                            args.append(cls._orient((sp.Eq if negated else sp.Ne)(difference, 0)))
+                            continue
+                        pending[(difference, positive)] = arg
+                        continue
+                    args.append(restore(arg))
+                args.extend(restore(arg) for arg in pending.values())
+                return node.func(*args)
+            if isinstance(node, sp.Not):
+                return sp.Not(restore(node.args[0]))
+            return atoms.get(node, node)
+
+        return restore(boolean)
+
     def _to_sympy(self, node: ASTNode):
         if node.value in self.symbols and not node.children:
             return self.symbols[node.value]
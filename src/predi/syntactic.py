@@ -0,0 +1,219 @@
+import hashlib
+from functools import lru_cache
+from typing import Callable, FrozenSet, Iterable, List, NamedTuple, Optional
+from predi.parser import ASTNode
+
+
+BOOLEAN_LITERALS = ('true', 'false')
+LOGICAL_OPERATORS = ('&&', '||', '!')
+EQUALITY_OPERATORS = ('==', '!=')
+ORDERING_OPERATORS = ('>', '<', '>=', '<=')
+ARITHMETIC_OPERATORS = ('+', '-', '*', '/', '%')
+
+# Relational atom kinds a premise built from atoms of a kind can imply: an ordering or an
+# equality can imply any kind of atom, a disequality only other disequalities
+IMPLIED_KINDS = {
+    'eq': frozenset({'eq', 'ne', 'ord'}),
+    'ord': frozenset({'eq', 'ne', 'ord'}),
+    'ne': frozenset({'ne'}),
+}
+
+_EMPTY = frozenset()
+
+
+class Signature(NamedTuple):
+    """
+    Cheap syntactic summary of a predicate, used to rule out implications without a solver.
+
+    `symbols` are the identifiers and call/index names the predicate mentions and `kinds` the
+    kinds (`eq`, `ne`, `ord`) of its relational atoms, after pushing negations inward.
+    `required_symbols` and `required_kinds` are those every disjunct of the predicate
+    constrains; both are None for a predicate that is false by construction.
+    """
+    symbols: FrozenSet[str]
+    kinds: FrozenSet[str]
+    required_symbols: Optional[FrozenSet[str]]
+    required_kinds: Optional[FrozenSet[str]]
+
+
+def signature(ast: ASTNode) -> Signature:
+    try:
+        return Signature(*_analyze(ast, True))
+    except RecursionError:
+        _fill_bottom_up(_analyze, (ast, True), _analysis_children)
+        return Signature(*_analyze(ast, True))
+
+
+def may_imply(premise: Signature, conclusion: Signature) -> bool:
+    """
+    False if `premise` cannot imply `conclusion`: some name or relational kind that every
+    disjunct of the conclusion constrains is absent from the premise. This assumes that the
+    atoms of the conclusion are not tautologies and that the premise is satisfiable.
+    """
+    if conclusion.required_symbols is None:
+        return True
+    if not conclusion.required_symbols <= premise.symbols:
+        return False
+    implied_kinds = _EMPTY.union(*(IMPLIED_KINDS[kind] for kind in premise.kinds))
+    return conclusion.required_kinds <= implied_kinds
+
+
+def _union(sets: Iterable[Optional[FrozenSet[str]]]) -> Optional[FrozenSet[str]]:
+    # None stands for "everything", the requirement of a false disjunct
+    result = _EMPTY
+    for items in sets:
+        if items is None:
+            return None
+        result |= items
+    return result
+
+
+def _intersection(sets: Iterable[Optional[FrozenSet[str]]]) -> Optional[FrozenSet[str]]:
+    result = None
+    for items in sets:
+        if items is not None:
+            result = items if result is None else result & items
+    return result
+
+
+def _fill_bottom_up(function: Callable, root: tuple, children: Callable[[tuple], List[tuple]]) -> None:
+    """
+    Call a memoized recursive function on every node below `root` (given as argument tuples),
+    children before parents and without recursing, so that a tree too deep for the recursion
+    limit (the iterative parser accepts chains of thousands of operands) can then be handled
+    with every recursive call finding the results of its children cached.
+    """
+    stack = [(root, False)]
+    seen = set()
+    while stack:
+        args, expanded = stack.pop()
+        if expanded:
+            function(*args)
+        elif args not in seen:
+            seen.add(args)
+            stack.append((args, True))
+            stack.extend((child, False) for child in children(args))
+
+
+def _analysis_children(args: tuple) -> List[tuple]:
+    node, positive = args
+    if node.value == '!' and len(node.children) == 1:
+        return [(node.children[0], not positive)]
+    if node.value in ('&&', '||'):
+        return [(child, positive) for child in node.children]
+    return []
+
+
+def _ast_children(args: tuple) -> List[tuple]:
+    return [(child,) for child in args[0].children]
+
+
+# ASTs are hash-consed, so shared subtrees of a corpus are analyzed once
+@lru_cache(maxsize=65536)
+def _analyze(node: ASTNode, positive: bool) -> tuple:
+    value, children = node.value, node.children
+    if value == '!' and len(children) == 1:
+        return _analyze(children[0], not positive)
+    if value in ('&&', '||') and children:
+        parts = [_analyze(child, positive) for child in children]
+        # Under a negation a conjunction turns into a disjunction, and the other way round
+        combine = _union if (value == '&&') == positive else _intersection
+        return (_EMPTY.union(*(part[0] for part in parts)), _EMPTY.union(*(part[1] for part in parts)),
+                combine(part[2] for part in parts), combine(part[3] for part in parts))
+    if not children and value in BOOLEAN_LITERALS:
+        required = _EMPTY if (value == 'true') == positive else None
+        return _EMPTY, _EMPTY, required, required
+
+    symbols = frozenset(_names(node))
+    kind = _kind(node, positive)
+    kinds = frozenset([kind]) if kind else _EMPTY
+    return symbols, kinds, symbols, kinds
+
+
+def _names(node: ASTNode) -> Iterable[str]:
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        value = node.value
+        if node.children:
+            if value not in LOGICAL_OPERATORS + EQUALITY_OPERATORS + ORDERING_OPERATORS + ARITHMETIC_OPERATORS:
+                yield value
+            stack.extend(node.children)
+        elif value not in BOOLEAN_LITERALS and not value[0].isdigit():
+            yield value
+
+
+def _kind(node: ASTNode, positive: bool) -> Optional[str]:
+    if node.value in ORDERING_OPERATORS:
+        return 'ord'
+    if node.value in EQUALITY_OPERATORS:
+        # Comparisons with `true`/`false` are boolean atoms in disguise (`used[salt] == false`)
+        if any(not child.children and child.value in BOOLEAN_LITERALS for child in node.children):
+            return None
+        return 'eq' if (node.value == '==') == positive else 'ne'
+    return None
+
+
+COMMUTATIVE_OPERATORS = ('&&', '||', '==', '!=', '+', '*')
+# Relations rewritten to their mirror image (`a > b` as `b < a`)
+MIRRORED_OPERATORS = {'>': '<', '>=': '<='}
+
+
+def serialize(ast: ASTNode) -> str:
+    """
+    Text form of an AST as a prefix S-expression, such as `(&& (< b a) c)`. Unlike the hash of
+    a node, it is the same in every process.
+    """
+    try:
+        return _serialize(ast)
+    except RecursionError:
+        _fill_bottom_up(_serialize, (ast,), _ast_children)
+        return _serialize(ast)
+
+
+@lru_cache(maxsize=65536)
+def _serialize(ast: ASTNode) -> str:
+    if not ast.children:
+        return ast.value
+    return f"({ast.value} {' '.join(_serialize(child) for child in ast.children)})"
+
+
+def canonical(ast: ASTNode) -> ASTNode:
+    """
+    Canonical form of an AST up to the order of the operands of commutative operators, the
+    grouping and repetition of `&&`/`||` operands, and mirrored relations. Predicates with
+    the same canonical form are equivalent; the form itself is not meant for evaluation.
+    Operands are ordered by their serialized text, so the form does not depend on the process.
+    """
+    try:
+        return _canonical(ast)
+    except RecursionError:
+        _fill_bottom_up(_canonical, (ast,), _ast_children)
+        return _canonical(ast)
+
+
+@lru_cache(maxsize=65536)
+def _canonical(ast: ASTNode) -> ASTNode:
+    if not ast.children:
+        return ast
+    value = ast.value
+    children = [_canonical(child) for child in ast.children]
+    if value in MIRRORED_OPERATORS and len(children) == 2:
+        value = MIRRORED_OPERATORS[value]
+        children.reverse()
+    if value in ('&&', '||'):
+        flattened = []
+        for child in children:
+            flattened.extend(child.children if child.value == value and child.children else [child])
+        children = list(dict.fromkeys(flattened))
+    if value in COMMUTATIVE_OPERATORS and len(children) > 1:
+        children.sort(key=serialize)
+    return ASTNode(value, children)
+
+
+def fingerprint(ast: ASTNode) -> str:
+    """
+    Stable hash of the canonical form of an AST: predicates with equal fingerprints are
+    equivalent.
+    """
+    return hashlib.blake2b(serialize(canonical(ast)).encode(), digest_size=8).hexdigest()
@@ -1,5 +1,5 @@
 import re
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 
 class Tokenizer:
@@ -51,6 +51,22 @@ class Tokenizer:
             'days': 86400,
             'weeks': 604800,
         }
+        self.time_unit_pattern = re.compile(r'(\d+)\s*(\w+)')
+        self.master_pattern, self.group_tags = self._compile_master_pattern(self.token_patterns)
+
+    def _compile_master_pattern(self, token_patterns: List[Tuple[str, str]]) -> Tuple[re.Pattern, Dict[str, str]]:
+        """
+        Compile the whole token table into a single alternation with one named
+        group per entry; alternatives are tried in table order, so the first
+        pattern that matches wins exactly as it did with per-pattern matching.
+        """
+        group_tags = {}
+        alternatives = []
+        for index, (pattern, tag) in enumerate(token_patterns):
+            group = f'T{index}'
+            group_tags[group] = tag
+            alternatives.append(f'(?P<{group}>{pattern})')
+        return re.compile('|'.join(alternatives)), group_tags
 
     def normalize(self, predicate: str) -> str:
         predicate = re.sub(r'\s+', '', predicate)
@@ -65,36 +81,24 @@ class Tokenizer:
         tokens = []
         position = 0
         length = len(predicate)
+        match_at = self.master_pattern.match
+        group_tags = self.group_tags
 
         while position < length:
-            match = None
-            for pattern, tag in self.token_patterns:
-                regex = re.compile(pattern)
-                match = regex.match(predicate, position)
-                if match:
-                    if tag:
-                        value = match.group(0)
-                        if tag == 'TIME_UNIT':
-                            number, unit = re.match(r'(\d+)\s*(\w+)', value).groups()
-                            value = str(int(number) * self.time_units[unit])
-                            tag = 'INTEGER'
-                        elif tag == 'SCIENTIFIC':
-                            value = str(int(float(value)))
-                            tag = 'INTEGER'
-                        tokens.append((value, tag))
-                    position = match.end()
-                    break
+            match = match_at(predicate, position)
             if not match:
-                if predicate[position] == '(':
-                    tokens.append(('(', 'LPAREN'))
-                    position += 1
-                elif predicate[position] == ')':
-                    tokens.append((')', 'RPAREN'))
-                    position += 1
-                elif predicate[position] == ',':
-                    tokens.append((',', 'COMMA'))
-                    position += 1
-                else:
-                    raise ValueError(f"Unexpected character: {predicate[position]} at position {position}")
+                raise ValueError(f"Unexpected character: {predicate[position]} at position {position}")
+            tag = group_tags[match.lastgroup]
+            if tag:
+                value = match.group(0)
+                if tag == 'TIME_UNIT':
+                    number, unit = self.time_unit_pattern.match(value).groups()
+                    value = str(int(number) * self.time_units[unit])
+                    tag = 'INTEGER'
+                elif tag == 'SCIENTIFIC':
+                    value = str(int(float(value)))
+                    tag = 'INTEGER'
+                tokens.append((value, tag))
+            position = match.end()
 
         return tokens
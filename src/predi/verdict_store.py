@@ -0,0 +1,174 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+from importlib import metadata
+from typing import Dict, Iterable, Optional, Tuple
+from predi.comparator import Comparator, Verdict
+
+
+# Bump to invalidate every stored verdict, e.g. after a change to the key format
+FORMAT_VERSION = 1
+# Modules whose code decides verdicts: any change to them invalidates the stored verdicts
+VERSIONED_MODULES = ('comparator', 'deadline', 'parser', 'refuter', 'simplifier', 'syntactic', 'tokenizer',
+                     'z3_backend')
+# Comparator options that change verdicts; the time budget does too, since a comparison
+# that runs out of it is decided by the Z3 fallback tier instead of the regular pipeline
+VERSIONED_OPTIONS = ('backend', 'fast_paths', 'refute', 'simplification', 'timeout')
+VERSIONED_PACKAGES = ('sympy', 'z3-solver')
+# Verdicts that depend on the time budget or on a failure, and are never stored
+UNSTORED_VERDICTS = (Verdict.ERROR, Verdict.TIMEOUT)
+# Keys per lookup query, below SQLite's limit on bound parameters
+LOOKUP_BATCH = 500
+# Seconds a writer waits for another process to release the database
+BUSY_TIMEOUT = 30.0
+
+
+def comparison_version(comparator: Comparator) -> str:
+    """
+    Version of the comparison logic of a comparator: a digest of the source of the modules
+    that decide verdicts, of the options that change them, and of the SymPy and Z3 versions.
+    Editing `Comparator._implies` (or anything else that can change a verdict) yields a new
+    version, so verdicts stored under the old one are no longer found.
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(f'{FORMAT_VERSION}:{type(comparator).__module__}.{type(comparator).__qualname__}'.encode())
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for module in VERSIONED_MODULES:
+        with open(os.path.join(directory, f'{module}.py'), 'rb') as file:
+            digest.update(file.read())
+    for option in VERSIONED_OPTIONS:
+        value = comparator.options[option]
+        # A budget of 5 is a budget of 5.0
+        if isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        digest.update(f'{option}={value!r};'.encode())
+    for package in VERSIONED_PACKAGES:
+        try:
+            digest.update(f'{package}={metadata.version(package)};'.encode())
+        except metadata.PackageNotFoundError:
+            pass
+    return digest.hexdigest()
+
+
+class VerdictStore:
+    """
+    Persistent cache of verdicts in an SQLite database, keyed by the canonical key of a pair
+    (see `predi.dedup`) under a version of the comparison logic (see `comparison_version`).
+
+    Lookups are batched (`get_many`) and writes go in one transaction per batch (`put_many`).
+    The database is in WAL mode, so any number of processes can read and write it at once;
+    each process opens its own connection on first use. Entries of other versions are kept
+    until `prune` removes them. Only definite verdicts are stored, not errors or timeouts.
+    """
+    def __init__(self, path: str, version: str):
+        self.path = path
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections must not cross a fork
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            with connection:
+                connection.execute('CREATE TABLE IF NOT EXISTS verdicts (version TEXT NOT NULL, key TEXT NOT NULL, '
+                                   'verdict INTEGER NOT NULL, PRIMARY KEY (version, key)) WITHOUT ROWID')
+            self._connection, self._pid = connection, os.getpid()
+        return self._connection
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Verdict]:
+        """
+        Stored verdicts of the given pair keys; keys without one are left out.
+        """
+        keys = list(dict.fromkeys(keys))
+        connection = self._connect()
+        found: Dict[str, Verdict] = {}
+        for start in range(0, len(keys), LOOKUP_BATCH):
+            batch = keys[start:start + LOOKUP_BATCH]
+            rows = connection.execute(f"SELECT key, verdict FROM verdicts WHERE version = ? AND key IN "
+                                      f"({', '.join('?' * len(batch))})", [self.version, *batch])
+            found.update((key, Verdict(verdict)) for key, verdict in rows)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: str) -> Optional[Verdict]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Iterable[Tuple[str, Verdict]]) -> int:
+        """
+        Store the verdicts of pair keys, returning the number stored.
+        """
+        rows = [(self.version, key, int(verdict)) for key, verdict in items if verdict not in UNSTORED_VERDICTS]
+        if rows:
+            with self._connect() as connection:
+                connection.executemany('INSERT OR REPLACE INTO verdicts (version, key, verdict) VALUES (?, ?, ?)', rows)
+        return len(rows)
+
+    def versions(self) -> Dict[str, int]:
+        """
+        Number of stored verdicts per version.
+        """
+        rows = self._connect().execute('SELECT version, COUNT(*) FROM verdicts GROUP BY version')
+        return dict(rows.fetchall())
+
+    def prune(self) -> int:
+        """
+        Delete the verdicts of every other version, returning the number deleted.
+        """
+        with self._connect() as connection:
+            return connection.execute('DELETE FROM verdicts WHERE version != ?', [self.version]).rowcount
+
+    def close(self) -> None:
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_connection'] = state['_pid'] = None
+        return state
+
+
+def pair_key(key1: str, key2: str) -> str:
+    """
+    Store key of a pair of predicates with the given canonical keys, in that order.
+    """
+    return hashlib.blake2b(f'{key1}\0{key2}'.encode(), digest_size=16).hexdigest()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Inspect a verdict store written by `predi.batch --verdict-store`. '
+                                                 'The current version is that of a comparator with the given options, '
+                                                 'which must match those of the runs whose verdicts are to be kept.')
+    parser.add_argument('store', help='SQLite verdict store')
+    parser.add_argument('-t', '--timeout', type=float, default=None, help='time budget of each comparison, in seconds')
+    parser.add_argument('--backend', default='sympy', choices=Comparator.backends)
+    parser.add_argument('--simplification', default='logic', choices=Comparator.simplification_levels,
+                        help='how thoroughly predicates are simplified (default: logic)')
+    parser.add_argument('--version', help='current version, as listed, instead of the one of the options above')
+    parser.add_argument('--prune', action='store_true', help='delete the verdicts of all but the current version')
+    args = parser.parse_args(argv)
+
+    version = args.version or comparison_version(Comparator(timeout=args.timeout, backend=args.backend,
+                                                            simplification=args.simplification))
+    with VerdictStore(args.store, version) as store:
+        if args.prune:
+            print(f"Deleted: {store.prune()}")
+        for version, count in store.versions().items():
+            print(f"{version}{' (current)' if version == store.version else ''}: {count}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,272 @@
+import z3
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from predi.cache import LRUCache
+from predi.parser import ASTNode
+from predi.deadline import ComparisonTimeout
+from predi.lazy import lazy_import
+
+# Only needed to translate SymPy expressions; the `z3` backend never loads it
+sp = lazy_import('sympy')
+
+
+LOGICAL_OPERATORS = ('&&', '||', '!')
+RELATIONAL_OPERATORS = ('>', '<', '>=', '<=')
+EQUALITY_OPERATORS = ('==', '!=')
+ARITHMETIC_OPERATORS = ('+', '-', '*', '/', '%')
+
+
+class Z3Predicate(NamedTuple):
+    term: z3.BoolRef
+    # Domain constraints on the numeric atoms of `term` (non-negativity of unsigned values)
+    assumptions: Tuple[z3.BoolRef, ...]
+
+
+class ImplicationSolver:
+    """
+    One incremental Z3 solver shared by all implication queries of a comparison.
+
+    Shared facts are asserted once. Each `premise && !conclusion` query is asserted behind
+    its own guard literal and checked under assumptions, so clauses learned by one query
+    (for instance `p1 -> p2`) are reused by the next (`p2 -> p1`), and every distinct
+    query is solved exactly once. Terms are keyed by their Z3 AST ids, since Z3 hash-conses
+    structurally equal terms.
+
+    With a `timeout` (in milliseconds) a query that runs out of time raises ComparisonTimeout
+    instead of being reported as "not proven".
+    """
+    def __init__(self, timeout: Optional[int] = None):
+        self.solver = z3.Solver()
+        if timeout is not None:
+            self.solver.set('timeout', timeout)
+        self.timeout = timeout
+        self.checks = 0
+        self._facts = set()
+        self._guards: Dict[int, z3.BoolRef] = {}
+        self._results: Dict[Tuple, bool] = {}
+
+    def add_facts(self, facts: Iterable[z3.BoolRef]) -> None:
+        for fact in facts:
+            if fact.get_id() not in self._facts:
+                self._facts.add(fact.get_id())
+                self.solver.add(fact)
+
+    def guard(self, constraint: z3.BoolRef) -> z3.BoolRef:
+        """
+        Assert `constraint` behind a guard literal (once) and return the literal, to be passed
+        as an assumption to the queries that rely on the constraint.
+        """
+        literal = self._guards.get(constraint.get_id())
+        if literal is None:
+            literal = z3.Bool(f'__guard_{len(self._guards)}')
+            self.solver.add(z3.Implies(literal, constraint))
+            self._guards[constraint.get_id()] = literal
+        return literal
+
+    def implies(self, premise: z3.BoolRef, conclusion: z3.BoolRef, assumptions: Tuple[z3.BoolRef, ...] = ()) -> bool:
+        """
+        Check if premise implies conclusion under the asserted facts and the given assumption
+        literals. An `unknown` answer is treated as "not proven".
+        """
+        key = (premise.get_id(), conclusion.get_id()) + tuple(literal.get_id() for literal in assumptions)
+        result = self._results.get(key)
+        if result is None:
+            query = self.guard(z3.And(premise, z3.Not(conclusion)))
+            self.checks += 1
+            answer = self.solver.check(query, *assumptions)
+            if answer == z3.unknown and self.timeout is not None and self.solver.reason_unknown() in ('timeout', 'canceled'):
+                raise ComparisonTimeout(f"Z3 query exceeded its timeout of {self.timeout}ms")
+            result = answer == z3.unsat
+            self._results[key] = result
+        return result
+
+
+class Z3Backend:
+    """
+    Lower parser ASTs straight into Z3 terms, without going through SymPy.
+
+    Identifiers become Real or Bool constants depending on the context they are used in,
+    and calls (`f()`) and index accesses (`m[]`) become uninterpreted functions applied
+    to their arguments. With `unsigned`, numeric variables and call results are assumed
+    non-negative, as most Solidity integers are `uint256`.
+    """
+    def __init__(self, unsigned: bool = True):
+        self.unsigned = unsigned
+        self.functions: Dict[Tuple, z3.FuncDeclRef] = {}
+        self._atoms: List[z3.ArithRef] = []
+
+    def lower(self, ast: ASTNode) -> Z3Predicate:
+        self._atoms = []
+        term = self._lower(ast, z3.BoolSort())
+        assumptions = tuple(atom >= 0 for atom in self._atoms) if self.unsigned else ()
+        return Z3Predicate(term, assumptions)
+
+    @staticmethod
+    def is_constant(predicate: Z3Predicate) -> bool:
+        """
+        Whether the term of a predicate simplifies to `true` or `false`.
+        """
+        term = z3.simplify(predicate.term)
+        return z3.is_true(term) or z3.is_false(term)
+
+    def implications(self, predicate1: Z3Predicate, predicate2: Z3Predicate,
+                     timeout: Optional[int] = None) -> Tuple[bool, bool]:
+        """
+        Check both implication directions between two predicates on one incremental solver,
+        under the domain assumptions of both. `timeout` bounds each query, in milliseconds.
+        """
+        solver = ImplicationSolver(timeout)
+        solver.add_facts(predicate1.assumptions + predicate2.assumptions)
+        return (solver.implies(predicate1.term, predicate2.term),
+                solver.implies(predicate2.term, predicate1.term))
+
+    def _is_boolean(self, node: ASTNode) -> bool:
+        if node.value in LOGICAL_OPERATORS + RELATIONAL_OPERATORS + EQUALITY_OPERATORS:
+            return bool(node.children)
+        return node.value in ('true', 'false')
+
+    def _lower(self, node: ASTNode, sort: z3.SortRef):
+        value = node.value
+        children = node.children
+
+        if not children:
+            return self._lower_leaf(value, sort)
+
+        if value in LOGICAL_OPERATORS:
+            args = [self._lower(child, z3.BoolSort()) for child in children]
+            if value == '&&':
+                term = z3.And(*args)
+            elif value == '||':
+                term = z3.Or(*args)
+            else:
+                term = z3.Not(args[0])
+        elif value in EQUALITY_OPERATORS:
+            operand_sort = z3.BoolSort() if any(self._is_boolean(child) for child in children) else z3.RealSort()
+            left, right = (self._lower(child, operand_sort) for child in children)
+            term = left == right if value == '==' else left != right
+        elif value in RELATIONAL_OPERATORS:
+            left, right = (self._lower(child, z3.RealSort()) for child in children)
+            term = {'>': left > right, '<': left < right, '>=': left >= right, '<=': left <= right}[value]
+        elif value in ARITHMETIC_OPERATORS:
+            args = [self._lower(child, z3.RealSort()) for child in children]
+            if len(args) == 1:
+                term = -args[0] if value == '-' else args[0]
+            elif value == '+':
+                term = args[0] + args[1]
+            elif value == '-':
+                term = args[0] - args[1]
+            elif value == '*':
+                term = args[0] * args[1]
+            elif value == '/':
+                term = args[0] / args[1]
+            else:
+                # Z3 has no modulus over reals; keep it opaque
+                term = self._function('%', [z3.RealSort(), z3.RealSort()], z3.RealSort())(*args)
+        else:
+            # Function call `f()` or index access `m[]`
+            args = [self._lower(child, z3.BoolSort() if self._is_boolean(child) else z3.RealSort()) for child in children]
+            term = self._function(value, [arg.sort() for arg in args], sort)(*args)
+            if sort == z3.RealSort():
+                self._atoms.append(term)
+
+        return self._coerce(term, sort)
+
+    def _lower_leaf(self, value: str, sort: z3.SortRef):
+        if value == 'true':
+            return self._coerce(z3.BoolVal(True), sort)
+        if value == 'false':
+            return self._coerce(z3.BoolVal(False), sort)
+        if value.startswith('0x'):
+            return self._coerce(z3.RealVal(int(value, 16)), sort)
+        if value[0].isdigit():
+            return self._coerce(z3.RealVal(value), sort)
+        if sort == z3.BoolSort():
+            return z3.Bool(value)
+        atom = z3.Real(value)
+        self._atoms.append(atom)
+        return atom
+
+    def _function(self, name: str, domain, range_sort) -> z3.FuncDeclRef:
+        signature = (name, tuple(domain), range_sort)
+        function = self.functions.get(signature)
+        if function is None:
+            function = z3.Function(name, *domain, range_sort)
+            self.functions[signature] = function
+        return function
+
+    def _coerce(self, term, sort: z3.SortRef):
+        if term.sort() == sort:
+            return term
+        if sort == z3.BoolSort():
+            return term != 0
+        return z3.If(term, z3.RealVal(1), z3.RealVal(0))
+
+
+class SympyToZ3:
+    """
+    Translation context from SymPy expressions to Z3 terms, shared by all implication queries
+    of a comparator (both directions of a pair, and the pairs of a batch).
+
+    Translated subterms are cached by SymPy node, so a subexpression shared by the two
+    predicates, or met again later in a batch, is translated once. Symbols are interned as Z3
+    Real constants per name, sums and products become flat n-ary terms, and applications of
+    undefined functions become uninterpreted Z3 functions of their translated arguments.
+    """
+    def __init__(self, cache_size: int = 4096):
+        self.constants: Dict[str, z3.ArithRef] = {}
+        self.functions: Dict[Tuple, z3.FuncDeclRef] = {}
+        self.terms = LRUCache(cache_size)
+
+    def constant(self, name: str) -> z3.ArithRef:
+        constant = self.constants.get(name)
+        if constant is None:
+            constant = self.constants[name] = z3.Real(name)
+        return constant
+
+    def translate(self, expr):
+        return self.terms.get_or_compute(expr, lambda: self._translate(expr))
+
+    def _translate(self, expr):
+        if isinstance(expr, sp.Symbol):
+            return self.constant(expr.name)
+        if isinstance(expr, sp.Integer):
+            return z3.RealVal(int(expr))
+        if isinstance(expr, sp.Rational):
+            return z3.Q(int(expr.p), int(expr.q))
+        if isinstance(expr, sp.Number):
+            return z3.RealVal(float(expr))
+        if expr is sp.true or expr is sp.false:
+            return z3.BoolVal(bool(expr))
+
+        args = [self.translate(arg) for arg in expr.args]
+        if isinstance(expr, sp.Eq):
+            return args[0] == args[1]
+        if isinstance(expr, sp.Ne):
+            return args[0] != args[1]
+        if isinstance(expr, sp.Gt):
+            return args[0] > args[1]
+        if isinstance(expr, sp.Ge):
+            return args[0] >= args[1]
+        if isinstance(expr, sp.Lt):
+            return args[0] < args[1]
+        if isinstance(expr, sp.Le):
+            return args[0] <= args[1]
+        if isinstance(expr, sp.And):
+            return z3.And(*args)
+        if isinstance(expr, sp.Or):
+            return z3.Or(*args)
+        if isinstance(expr, sp.Not):
+            return z3.Not(args[0])
+        if isinstance(expr, sp.Add):
+            return z3.Sum(*args)
+        if isinstance(expr, sp.Mul):
+            return z3.Product(*args)
+        if isinstance(expr, sp.Pow):
+            return args[0] ** args[1]
+        if isinstance(expr, sp.Function):
+            domain = tuple(arg.sort() for arg in args)
+            signature = (expr.func.__name__, domain)
+            function = self.functions.get(signature)
+            if function is None:
+                function = self.functions[signature] = z3.Function(expr.func.__name__, *domain, z3.RealSort())
+            return function(*args)
+        raise ValueError(f"Unsupported expression type: {expr}")
@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from src.predi.async_comparator import AsyncComparator
+from src.predi.comparator import TIMEOUT_VERDICT
+
+
+class TestAsyncComparator(unittest.TestCase):
+    def test_compare(self):
+        async def run():
+            async with AsyncComparator(max_workers=2) as comparator:
+                return await asyncio.gather(comparator.compare("a > b", "a >= b"),
+                                            comparator.compare("x >= y", "x == y"))
+
+        self.assertEqual(asyncio.run(run()), ['The first predicate is stronger.', 'The second predicate is stronger.'])
+
+    def test_compare_many_in_processes(self):
+        pairs = [("a < b", "a <= b"), ("a $ b", "a > b"), ("a > b", " a>b")]
+
+        async def run():
+            async with AsyncComparator(executor='process', max_workers=2) as comparator:
+                return [result async for result in comparator.compare_many(pairs)]
+
+        results = asyncio.run(run())
+        self.assertEqual([result.index for result in results], [0, 1, 2])
+        self.assertEqual(results[0].verdict, 'The first predicate is stronger.')
+        self.assertTrue(results[1].error.startswith('ValueError'))
+        self.assertEqual(results[2].verdict, 'The predicates are equivalent.')
+
+    def test_event_loop_is_not_blocked(self):
+        async def run():
+            async with AsyncComparator(max_in_flight=1) as comparator:
+                comparison = asyncio.ensure_future(comparator.compare("a > b * 2", "a > b"))
+                queued = asyncio.ensure_future(comparator.compare("a > c", "a >= c"))
+                ticks = 0
+                while not comparison.done():
+                    ticks += 1
+                    await asyncio.sleep(0.001)
+                # The second call waits for a slot, so it can still be withdrawn
+                queued.cancel()
+                return ticks, await comparison, await asyncio.gather(queued, return_exceptions=True)
+
+        ticks, verdict, (queued,) = asyncio.run(run())
+        self.assertGreater(ticks, 0)
+        self.assertEqual(verdict, 'The first predicate is stronger.')
+        self.assertIsInstance(queued, asyncio.CancelledError)
+
+    def test_given_executor(self):
+        with ThreadPoolExecutor(2) as executor:
+            with self.assertRaises(ValueError):
+                AsyncComparator(executor=executor)
+            comparator = AsyncComparator(executor=executor, max_in_flight=2)
+            self.assertEqual(asyncio.run(comparator.compare("a > b", "a >= b")), 'The first predicate is stronger.')
+        comparator = AsyncComparator(max_workers=3)
+        self.assertEqual(comparator.max_in_flight, 3)
+        comparator.close()
+
+    def test_timeout(self):
+        async def run():
+            async with AsyncComparator() as comparator:
+                return await comparator.compare("a > b", "a >= b", timeout=1e-6)
+
+        self.assertEqual(asyncio.run(run()), TIMEOUT_VERDICT)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from src.predi.cache import LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_eviction_order(self):
+        cache = LRUCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertNotIn('b', cache)
+        self.assertIn('a', cache)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 0, 'evictions': 1, 'size': 2, 'maxsize': 2})
+
+    def test_get_or_compute(self):
+        cache = LRUCache(maxsize=4)
+        calls = []
+        compute = lambda: calls.append(1) or len(calls)
+        self.assertEqual(cache.get_or_compute('key', compute), 1)
+        self.assertEqual(cache.get_or_compute('key', compute), 1)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_disabled(self):
+        cache = LRUCache(maxsize=0)
+        cache.put('a', 1)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from src.predi.comparator import Comparator
+from src.predi.comparator import Comparator, ComparisonTimeout, TIMEOUT_VERDICT
 
 
 # Test cases for the Comparator class
@@ -48,6 +48,105 @@ class TestComparator(unittest.TestCase):
                 result = self.comparator.compare(data[0], data[1])
                 self.assertEqual(result, expected, f"Test case failed: {data[0]} vs {data[1]}")
 
+    def test_comparator_z3_backend(self):
+        comparator = Comparator(backend='z3')
+        for expected, test_data in test_cases.items():
+            for data in test_data:
+                result = comparator.compare(data[0], data[1])
+                self.assertEqual(result, expected, f"Test case failed: {data[0]} vs {data[1]}")
+
+    def test_compare_many(self):
+        pairs = [data for test_data in test_cases.values() for data in test_data]
+        expected = [verdict for verdict, test_data in test_cases.items() for _ in test_data]
+        pairs.insert(3, ("a $ b", "a > b"))
+        expected.insert(3, None)
+
+        results = list(self.comparator.compare_many(pairs, workers=2, chunksize=2))
+        self.assertEqual([result.index for result in results], list(range(len(pairs))))
+        self.assertEqual([result.verdict for result in results], expected)
+        self.assertIn("Unexpected character", results[3].error)
+
+    def test_compare_with_time_budget(self):
+        comparator = Comparator(timeout=60)
+        self.assertEqual(comparator.compare("a > b", "a >= b"), 'The first predicate is stronger.')
+        # An exhausted budget degrades to the syntactic tier, then to "unknown"
+        self.assertEqual(comparator.compare("a > b", " a>b", timeout=1e-6), 'The predicates are equivalent.')
+        self.assertEqual(comparator.compare("a > b", "a >= b", timeout=1e-6), TIMEOUT_VERDICT)
+
+    def test_z3_fallback(self):
+        # The fallback tier decides with the semantics of the backend that timed out
+        class StalledComparator(Comparator):
+            def _compare(self, predicate1, predicate2, disjoint=False):
+                raise ComparisonTimeout("Stalled")
+
+        for backend in ('sympy', 'z3'):
+            with self.subTest(backend=backend):
+                expected = Comparator(backend=backend).compare("a > 0", "a != 0")
+                self.assertEqual(StalledComparator(backend=backend).compare("a > 0", "a != 0", timeout=30), expected)
+
+    def test_fast_paths(self):
+        comparator = Comparator()
+        cases = [
+            ("a > b", " a>b", 'identical_text', 'The predicates are equivalent.'),
+            ("now >= start + 1 days", "now>=start+1 days", 'identical_tokens', 'The predicates are equivalent.'),
+            ("a > b && c", "c && b < a", 'canonical_ast', 'The predicates are equivalent.'),
+            ("msg.sender == owner", "a >= b", 'disjoint', 'The predicates are not equivalent and neither is stronger.'),
+            ("a > b", "a >= b", None, None),
+        ]
+        for predicate1, predicate2, fast_path, verdict in cases:
+            with self.subTest(predicate1=predicate1, predicate2=predicate2):
+                self.assertEqual(comparator.classify(predicate1, predicate2), (fast_path, verdict))
+        self.assertEqual(comparator.compare("msg.sender == owner", "a >= b"), cases[3][3])
+        self.assertEqual(comparator.fast_path_counts, {'disjoint': 1})
+        # A tautology is implied by anything, so disjoint signatures do not make a pair incomparable
+        self.assertEqual(comparator.classify("a >= a", "b <= b"), (None, None))
+        self.assertEqual(comparator.compare("a >= a", "b <= b"), 'The predicates are equivalent.')
+        self.assertEqual(comparator.fast_path_counts, {'disjoint': 1})
+        # Chains deeper than the recursion limit
+        terms = [f"x{i} > {i}" for i in range(1200)]
+        self.assertEqual(comparator.classify(" && ".join(terms), " && ".join(reversed(terms))),
+                         ('canonical_ast', 'The predicates are equivalent.'))
+
+    def test_prepare_cache(self):
+        comparator = Comparator(cache_size=2, fast_paths=False)
+        comparator.compare("a>=b", "b <= a")
+        comparator.compare("a >= b", "c > a")
+        self.assertEqual(comparator.cache.stats(), {'hits': 1, 'misses': 3, 'evictions': 1, 'size': 2, 'maxsize': 2})
+        self.assertIsNot(comparator.prepare("1days > a"), comparator.prepare("1 days > a"))
+
+    def test_simplification_levels(self):
+        for level in Comparator.simplification_levels:
+            comparator = Comparator(simplification=level, fast_paths=False)
+            with self.subTest(level=level):
+                self.assertEqual(comparator.compare("limiter[identity][sender]<(now-adminRate)",
+                                                    "limiter[identity][sender]+adminRate<now"), "The predicates are equivalent.")
+                self.assertEqual(comparator.compare("a > b", "a >= b"), "The first predicate is stronger.")
+        # Complementary relations over the same operands are related before the Boolean skeleton is minimized
+        for level in ('logic', 'full'):
+            with self.subTest(level=level):
+                self.assertEqual(Comparator(simplification=level).compare("a != 0", "a > 0 || a < 0"),
+                                 "The predicates are equivalent.")
+        with self.assertRaises(ValueError):
+            Comparator(simplification='thorough')
+
+    def test_sympy_to_z3(self):
+        comparator = Comparator()
+        expr1 = comparator.prepare("balanceOf(msg.sender) >= a + b + c * 2 * d").expr
+        expr2 = comparator.prepare("balanceOf(msg.sender) > a + b").expr
+        term1 = comparator.sympy_to_z3(expr1)
+        # Sums and products are flat, calls are uninterpreted functions
+        self.assertEqual(term1.arg(1).num_args(), 3)
+        self.assertEqual(term1.arg(1).arg(2).num_args(), 3)
+        self.assertEqual(term1.arg(0).decl().name(), 'balanceOf')
+        translator = comparator.translator
+        misses = translator.terms.misses
+        term2 = comparator.sympy_to_z3(expr2)
+        # Only the relation and `a + b` are new; the call and the symbols are reused
+        self.assertTrue(term2.arg(0).eq(term1.arg(0)))
+        self.assertEqual(translator.terms.misses - misses, 2)
+        self.assertIs(comparator.sympy_to_z3(expr1), term1)
+        self.assertEqual(set(translator.constants), {'a', 'b', 'c', 'd', 'msg_sender'})
+
 
 if __name__ == '__main__':
     unittest.main()
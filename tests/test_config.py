@@ -0,0 +1,30 @@
+import logging
+import unittest
+from src.predi.config import Tracer, is_debugging, load_config
+
+
+class TestTracer(unittest.TestCase):
+    def test_disabled_tracer_does_not_format(self):
+        tracer = Tracer('test_config_disabled')
+        tracer.logger.setLevel(logging.WARNING)
+        calls = []
+        tracer.debug(lambda: calls.append(1) or 'message')
+        self.assertFalse(tracer.enabled)
+        self.assertEqual(calls, [])
+
+    def test_enabled_tracer_indents(self):
+        tracer = Tracer('test_config_enabled')
+        tracer.logger.setLevel(logging.DEBUG)
+        with self.assertLogs(tracer.logger, level='DEBUG') as logs:
+            tracer.debug("Implies %s to %s", 'a', 'b', depth=2)
+        self.assertEqual(logs.records[0].getMessage(), "    Implies a to b")
+
+    def test_module_switches(self):
+        load_config('config.yaml')
+        self.assertTrue(is_debugging('test_comparator_with_dataset'))
+        self.assertFalse(is_debugging('comparator'))
+        self.assertFalse(is_debugging('unknown_module'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import unittest
+from src.predi.comparator import Comparator, FIRST_STRONGER_VERDICT, SECOND_STRONGER_VERDICT
+from src.predi.dedup import PairIndex, canonical_key, compare_deduplicated, dedupe_pairs, group_predicates
+
+
+class TestDedup(unittest.TestCase):
+    def test_canonical_keys(self):
+        self.assertEqual(canonical_key("a>=b && msg.sender==owner"), canonical_key("(owner == msg.sender) && b <= a"))
+        self.assertNotEqual(canonical_key("a >= b"), canonical_key("a > b"))
+        self.assertEqual(canonical_key("a >= (b"), canonical_key("a>=(b"))
+        groups = group_predicates(["a > b", "x", "b<a", "(x)", "a >= b"])
+        self.assertEqual(list(groups.values()), [[0, 2], [1, 3], [4]])
+
+    def test_dedupe_pairs(self):
+        pairs = [("a > b", "a >= b"), ("b < a", "b <= a"), ("a >= b", "a > b"), ("x", "y")]
+        unique_pairs, indexes = dedupe_pairs(pairs)
+        self.assertEqual(len(unique_pairs), 2)
+        self.assertEqual(indexes[0], indexes[1])
+        self.assertEqual(indexes[2], PairIndex(indexes[0].unique, not indexes[0].swapped))
+
+    def test_compare_deduplicated(self):
+        pairs = [("a > b", "a >= b"), ("b < a", "b <= a"), ("a >= b", "a > b"), ("a > b", "b < a")]
+        results = list(compare_deduplicated(pairs, Comparator(), workers=1))
+        self.assertEqual([result.index for result in results], [0, 1, 2, 3])
+        self.assertEqual([(result.predicate1, result.predicate2) for result in results], pairs)
+        self.assertEqual([result.verdict for result in results[:3]],
+                         [FIRST_STRONGER_VERDICT, FIRST_STRONGER_VERDICT, SECOND_STRONGER_VERDICT])
+        self.assertEqual(set(results[2].counterexamples), {'1->2'})
+
+
+if __name__ == '__main__':
+    unittest.main()
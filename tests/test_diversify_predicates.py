@@ -0,0 +1,41 @@
+import csv
+import os
+import tempfile
+import types
+import unittest
+from src.predi.diversify_predicates import diversify_predicates, diversify_rows, read_rows, synthesize_rows
+
+
+SAMPLE = 'datasets/predicate_sample_100.csv'
+
+
+class TestDiversifyPredicates(unittest.TestCase):
+    def test_seeded(self):
+        rows = list(read_rows(SAMPLE))
+        first = list(diversify_rows([dict(row) for row in rows], seed=1, chunksize=16))
+        self.assertEqual(first, list(diversify_rows([dict(row) for row in rows], seed=1, chunksize=16)))
+        self.assertNotEqual(first, list(diversify_rows([dict(row) for row in rows], seed=2, chunksize=16)))
+        self.assertEqual([row['predicate'] for row in first], [row['predicate'] for row in rows])
+
+    def test_sharded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            serial, sharded = os.path.join(directory, 'serial.csv'), os.path.join(directory, 'sharded.csv')
+            self.assertEqual(diversify_predicates(SAMPLE, serial, chunksize=8), 100)
+            self.assertEqual(diversify_predicates(SAMPLE, sharded, workers=2, chunksize=8), 100)
+            with open(serial) as file1, open(sharded) as file2:
+                self.assertEqual(file1.read(), file2.read())
+            with open(serial, newline='') as csvfile:
+                self.assertEqual(csv.DictReader(csvfile).fieldnames, ['index', 'predicate', 'diversified_predicate'])
+
+    def test_synthesize(self):
+        predicates = ["a > b", "msg.sender == owner && !paused"]
+        rows = synthesize_rows(predicates, 1000, seed=3, chunksize=64)
+        self.assertIsInstance(rows, types.GeneratorType)
+        rows = list(rows)
+        self.assertEqual([row['index'] for row in rows], list(range(1000)))
+        self.assertTrue(all(row['predicate'] in predicates for row in rows))
+        self.assertEqual(rows, list(synthesize_rows(predicates, 1000, seed=3, workers=2, chunksize=64)))
+
+
+if __name__ == '__main__':
+    unittest.main()
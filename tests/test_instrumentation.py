@@ -0,0 +1,39 @@
+import json
+import unittest
+from src.predi.comparator import Comparator
+from src.predi.instrumentation import percentile
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_compare_profiles(self):
+        comparator = Comparator(instrument=True)
+        comparator.compare("a > b", "a >= b")
+        profile = comparator.instrumentation.last_pair
+        for stage in ('tokenize', 'parse', 'to_sympy', 'simplify', 'implies', 'total'):
+            self.assertIn(stage, profile['stages'])
+        self.assertEqual(profile['calls']['tokenize'], 2)
+        self.assertEqual(profile['counters']['cache_misses'], 2)
+        self.assertGreater(sum(profile['branches'].values()), 0)
+
+        comparator.compare("a > b", "msg.sender == owner && a > b")
+        summary = json.loads(comparator.instrumentation.to_json())
+        self.assertEqual(summary['pairs'], 2)
+        self.assertEqual(summary['stages']['total']['count'], 2)
+        self.assertEqual(summary['counters']['cache_hits']['total'], 1)
+        self.assertIn('p95', summary['recursion_depth'])
+
+    def test_uninstrumented_comparator(self):
+        comparator = Comparator()
+        comparator.compare("a > b", "a >= b")
+        self.assertIsNone(comparator.instrumentation.last_pair)
+        self.assertEqual(comparator.instrumentation.summary()['pairs'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
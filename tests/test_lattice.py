@@ -0,0 +1,40 @@
+import unittest
+from src.predi.lattice import ImplicationIndex
+
+
+corpus = [
+    "a > 5", "a > 3", "a >= 3", "3 < a", "a > 3 && b > 0", "b > 0", "a > 3 || c > 1",
+    "msg.sender == owner", "msg.sender == owner && a > 5", "used[salt] == false", "x != y",
+]
+
+
+class TestImplicationIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.index = ImplicationIndex(predicates=corpus)
+
+    def test_hasse_diagram(self):
+        diagram = self.index.hasse_diagram()
+        self.assertEqual(diagram["msg.sender == owner && a > 5"], ["a > 5", "msg.sender == owner"])
+        self.assertEqual(diagram["a > 5"], ["a > 3"])
+        self.assertEqual(diagram["a > 3"], ["a >= 3", "a > 3 || c > 1"])
+        self.assertNotIn("3 < a", diagram)
+        self.assertEqual(self.index.stats()['predicates'], len(corpus))
+
+    def test_queries(self):
+        self.assertEqual(self.index.equivalent("a>3"), ["a > 3", "3 < a"])
+        self.assertEqual(self.index.stronger("a > 3"), ["a > 5", "a > 3 && b > 0", "msg.sender == owner && a > 5"])
+        self.assertEqual(self.index.weaker("a > 4"), ["a > 3", "3 < a", "a >= 3", "a > 3 || c > 1"])
+        self.assertEqual(self.index.stronger("!used[salt]"), [])
+        self.assertEqual(self.index.equivalent("!used[salt]"), ["used[salt] == false"])
+
+    def test_pruning_and_inference_skip_comparisons(self):
+        index = ImplicationIndex(predicates=corpus)
+        comparisons = index.comparisons
+        index.weaker("a > 10")
+        self.assertLess(index.comparisons - comparisons, len(index.members))
+        self.assertGreater(index.pruned, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+import unittest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('sympy', 'sympy.logic.inference', 'z3')
+
+
+def run_python(*args):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.path.join(ROOT, 'src'), os.environ.get('PYTHONPATH')])))
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+
+
+def loaded_after(statements):
+    code = '; '.join(['import sys', *statements, f"print(*[name in sys.modules for name in {HEAVY_MODULES!r}])"])
+    return run_python('-c', code).split()[-len(HEAVY_MODULES):]
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_import_does_not_load_backends(self):
+        self.assertEqual(loaded_after(['import predi.comparator', 'import predi.batch']), ['False'] * 3)
+
+    def test_trivial_comparisons_do_not_load_backends(self):
+        for backend in ('sympy', 'z3'):
+            with self.subTest(backend=backend):
+                statements = ['from predi.comparator import Comparator',
+                              f"print(Comparator(backend='{backend}').compare('a > b', ' a>b'))"]
+                self.assertEqual(loaded_after(statements), ['False'] * 3)
+
+    def test_backends_load_on_demand(self):
+        statements = ['from predi.comparator import Comparator', "Comparator().compare('a > b', 'a >= b')"]
+        self.assertEqual(loaded_after(statements)[0], 'True')
+
+    def test_cli_usage_error(self):
+        self.assertIn('Usage', run_python('main.py'))
+        self.assertEqual(run_python('main.py', 'a > b', 'a>b').strip(), 'The predicates are equivalent.')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,8 @@
+import pickle
+import re
 import unittest
 from src.predi.tokenizer import Tokenizer
-from src.predi.parser import Parser, ASTNode
+from src.predi.parser import Parser, ASTNode, RecursiveDescentParser
 
 
 class TestParser(unittest.TestCase):
@@ -41,7 +43,50 @@ class TestParser(unittest.TestCase):
         parser = Parser(tokens)
         ast = parser.parse()
         expected_ast = ASTNode('obj.methodCall(param1, param2)')
-      
+
+    def test_structurally_equal_subtrees_are_shared(self):
+        ast1 = Parser(self.tokenizer.tokenize("balances[msg.sender] >= amount")).parse()
+        ast2 = Parser(self.tokenizer.tokenize("balances[msg.sender] < amount || paused")).parse()
+        self.assertIs(ast1.children[0], ast2.children[0].children[0])
+        self.assertEqual(ast1, ASTNode('>=', [ASTNode('balances[]', [ASTNode('msg.sender')]), ASTNode('amount')]))
+        self.assertNotEqual(ast1, ast2)
+        self.assertEqual(len({ast1: 1, ast1.children[0]: 2, ASTNode('>=', ast1.children): 3}), 2)
+
+    def test_matches_recursive_descent(self):
+        predicates = ["a + b * c - d >= e / 2 && !paused || x != y",
+                      "-(a) * +b % c == !f(g[h].i, k(), 1)",
+                      "balances[msg.sender].amount > 0x1234 && (true || owner == msg.origin)",
+                      "a b", "(a) (b)", "f(a,", "a[", "(a", ")"]
+        for predicate in predicates:
+            with self.subTest(predicate=predicate):
+                tokens = self.tokenizer.tokenize(predicate)
+                try:
+                    expected = RecursiveDescentParser(tokens).parse()
+                except ValueError as e:
+                    with self.assertRaisesRegex(ValueError, re.escape(str(e))):
+                        Parser(tokens).parse()
+                else:
+                    self.assertIs(Parser(tokens).parse(), expected)
+
+    def test_deeply_nested_predicates(self):
+        depth = 5000
+        ast = Parser(self.tokenizer.tokenize('(' * depth + 'a > b' + ')' * depth)).parse()
+        self.assertIs(ast, ASTNode('>', [ASTNode('a'), ASTNode('b')]))
+        ast = Parser(self.tokenizer.tokenize(' && '.join(f'x{i} > 0' for i in range(depth)))).parse()
+        self.assertEqual(ast.value, '&&')
+        self.assertIs(ast.children[1], ASTNode('>', [ASTNode(f'x{depth - 1}'), ASTNode('0')]))
+        predicate = 'a > b'
+        for _ in range(depth):
+            predicate = f'({predicate}) && (true)'
+        ast = Parser(self.tokenizer.tokenize(predicate)).parse()
+        self.assertIs(ast.children[1], ASTNode('true'))
+
+    def test_nodes_are_immutable(self):
+        node = ASTNode('a')
+        with self.assertRaises(AttributeError):
+            node.value = 'b'
+        self.assertIs(pickle.loads(pickle.dumps(ASTNode('!', [node]))), ASTNode('!', [node]))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import sympy as sp
+from src.predi.comparator import Comparator, FIRST_STRONGER_VERDICT, EQUIVALENT_VERDICT
+from src.predi.refuter import Refuter
+
+
+class TestRefuter(unittest.TestCase):
+    def setUp(self):
+        self.comparator = Comparator(fast_paths=False)
+        self.refuter = Refuter()
+
+    def expr(self, predicate):
+        return self.comparator.prepare(predicate).simplified
+
+    def test_counterexamples(self):
+        counterexample = self.refuter.refute(self.expr("a > b"), self.expr("a > c"))
+        self.assertIsNotNone(counterexample)
+        self.assertGreater(counterexample['a'], counterexample['b'])
+        self.assertLessEqual(counterexample['a'], counterexample['c'])
+        # Only found at the uint256 boundary
+        self.assertEqual(self.refuter.refute(self.expr("a >= 0"), self.expr(f"a < {2 ** 256 - 1}")),
+                         {'a': 2 ** 256 - 1})
+        # Calls and index accesses are opaque variables
+        counterexample = self.refuter.refute(self.expr("balances[msg.sender] >= amount"),
+                                             self.expr("balances[msg.sender] > amount"))
+        self.assertEqual(len(set(counterexample.values())), 1)
+
+    def test_no_counterexamples(self):
+        implications = [
+            ("a > b", "a >= b"),
+            ("a > b && b > c", "a > c"),
+            ("!paused && a > 0", "paused == false"),
+            ("used[salt] == false", "!used[salt]"),
+        ]
+        for premise, conclusion in implications:
+            with self.subTest(premise=premise, conclusion=conclusion):
+                self.assertIsNone(self.refuter.refute(self.expr(premise), self.expr(conclusion)))
+
+    def test_function_congruence(self):
+        # Calls of one function on equal arguments get equal values
+        self.assertIsNone(self.refuter.refute(self.expr("a == b && f(a) > 0"), self.expr("f(b) > 0")))
+        self.assertIsNone(self.refuter.refute(self.expr("g(a) == g(b) && f(g(a)) > 0"), self.expr("f(g(b)) > 0")))
+        counterexample = self.refuter.refute(self.expr("f(a) > 0"), self.expr("f(b) > 0"))
+        self.assertNotEqual(counterexample['a'], counterexample['b'])
+        self.comparator.compare("a == b && f(a) > 0", "f(b) > 0")
+        self.assertNotIn('1->2', self.comparator.last_counterexamples)
+
+    def test_comparator(self):
+        self.assertEqual(self.comparator.compare("a > b", "a >= b"), FIRST_STRONGER_VERDICT)
+        self.assertEqual(set(self.comparator.last_counterexamples), {'2->1'})
+        self.assertEqual(self.comparator.compare("used[salt] == false", "!used[salt]"), EQUIVALENT_VERDICT)
+        self.assertEqual(self.comparator.last_counterexamples, {})
+        result = next(self.comparator.compare_many([("a > b", "a >= b")], workers=1))
+        counterexample = result.counterexamples['2->1']
+        self.assertEqual(counterexample['a'], counterexample['b'])
+        self.assertEqual(Comparator(refute=False).compare("a > b", "a >= b"), FIRST_STRONGER_VERDICT)
+
+
+if __name__ == '__main__':
+    unittest.main()
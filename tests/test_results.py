@@ -0,0 +1,80 @@
+import csv
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from src.predi.batch import compare_csv
+from src.predi.comparator import (Comparator, ComparisonResult, EQUIVALENT_VERDICT, FIRST_STRONGER_VERDICT,
+                                  TIMEOUT_VERDICT, Verdict)
+from src.predi.results import ResultStore, StoredResult, write_results
+
+
+class TestResults(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'store')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_verdict_codes(self):
+        for verdict in Verdict:
+            self.assertIs(Verdict.of(verdict.text), verdict)
+        self.assertIs(Verdict.of(TIMEOUT_VERDICT), Verdict.TIMEOUT)
+        with self.assertRaises(ValueError):
+            Verdict.of("Exact Match")
+
+    def test_round_trip(self):
+        results = [
+            ComparisonResult(0, "a > b", "b < a", EQUIVALENT_VERDICT, seconds=0.25, fast_path='canonical_ast'),
+            ComparisonResult(1, "a > b", "a >= b", FIRST_STRONGER_VERDICT, seconds=1.5),
+            ComparisonResult(2, "a $ b", "a", None, "ValueError: Unexpected character"),
+        ]
+        self.assertEqual(write_results(results, self.path), 3)
+        with ResultStore(self.path) as store:
+            self.assertEqual(list(store), [
+                StoredResult(0, Verdict.EQUIVALENT, 0.25, 'canonical_ast'),
+                StoredResult(1, Verdict.FIRST_STRONGER, 1.5, None),
+                StoredResult(2, Verdict.ERROR, None, None),
+            ])
+            self.assertEqual(store.verdict_counts()[Verdict.EQUIVALENT], 1)
+            self.assertEqual(store.fast_path_counts(), {None: 2, 'identical_text': 0, 'identical_tokens': 0,
+                                                        'canonical_ast': 1, 'disjoint': 0})
+            self.assertEqual(store.column('verdict').tolist(), [3, 1, 0])
+
+            output = io.StringIO()
+            with redirect_stdout(output):
+                store.to_csv(pairs=[(result.predicate1, result.predicate2) for result in results])
+            rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+            self.assertEqual(rows[1]['result'], FIRST_STRONGER_VERDICT)
+            self.assertEqual(rows[2]['predicate'], "a $ b")
+            self.assertEqual(rows[2]['seconds'], '')
+
+    def test_empty(self):
+        write_results([], self.path)
+        with ResultStore(self.path) as store:
+            self.assertEqual(len(store), 0)
+            self.assertEqual(sum(store.verdict_counts().values()), 0)
+
+    def test_truncated(self):
+        results = [ComparisonResult(index, "a > b", "a >= b", FIRST_STRONGER_VERDICT, seconds=1.0) for index in range(3)]
+        for size in (0, 7):
+            with self.subTest(size=size):
+                write_results(results, self.path)
+                with open(os.path.join(self.path, 'seconds.bin'), 'r+b') as file:
+                    file.truncate(size)
+                with self.assertRaisesRegex(ValueError, 'seconds.bin'):
+                    ResultStore(self.path)
+
+    def test_batch(self):
+        successes, failures = compare_csv('datasets/diversified_predicates_small.csv', workers=1,
+                                          comparator=Comparator(timeout=5), store=self.path)
+        with ResultStore(self.path) as store:
+            self.assertEqual(len(store), successes + failures)
+            self.assertEqual(store.verdict_counts()[Verdict.ERROR], failures)
+            self.assertEqual(store.column('index').tolist(), list(range(len(store))))
+
+
+if __name__ == '__main__':
+    unittest.main()
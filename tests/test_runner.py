@@ -0,0 +1,67 @@
+import json
+import os
+import signal
+import tempfile
+import time
+import unittest
+from src.predi.comparator import Comparator, EQUIVALENT_VERDICT, FIRST_STRONGER_VERDICT
+from src.predi.runner import DatasetRunner, read_outcomes
+
+
+class MisbehavingComparator(Comparator):
+    """
+    Comparator that hangs on predicates mentioning `hang` and kills its process on
+    predicates mentioning `crash`, as a stuck SymPy call or a Z3 segfault would.
+    """
+    def compare(self, predicate1, predicate2, timeout=None):
+        if 'hang' in predicate1:
+            time.sleep(60)
+        if 'crash' in predicate1:
+            os.kill(os.getpid(), signal.SIGKILL)
+        return super().compare(predicate1, predicate2, timeout)
+
+
+class TestDatasetRunner(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.directory.name, 'outcomes.jsonl')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_fault_isolation(self):
+        pairs = [("a > b", "a >= b"), ("hang > 0", "hang >= 0"), ("a > b", "b < a"),
+                 ("crash > 0", "crash >= 0"), ("a $ b", "a"), ("x == 1", "x == 1 && y == 2")]
+        runner = DatasetRunner(MisbehavingComparator(), workers=2, timeout=2, shard_size=3)
+        counts = runner.run(pairs, self.output)
+        self.assertEqual(counts, {'ok': 3, 'error': 1, 'timeout': 1, 'crashed': 1})
+
+        outcomes = read_outcomes(self.output)
+        self.assertEqual(sorted(outcomes), list(range(6)))
+        self.assertEqual(outcomes[0]['verdict'], FIRST_STRONGER_VERDICT)
+        self.assertEqual(outcomes[1]['status'], 'timeout')
+        self.assertEqual(outcomes[2]['verdict'], EQUIVALENT_VERDICT)
+        self.assertEqual(outcomes[3]['status'], 'crashed')
+        self.assertIn(str(-signal.SIGKILL), outcomes[3]['error'])
+        self.assertTrue(outcomes[4]['error'].startswith('ValueError'))
+        self.assertEqual(outcomes[5]['predicate'], "x == 1")
+
+    def test_resume(self):
+        pairs = [("a > b", "a >= b"), ("a > b", "b < a"), ("x == 1", "x >= 1")]
+        with open(self.output, 'w') as file:
+            file.write(json.dumps({'index': 0, 'status': 'ok', 'verdict': 'recorded'}) + '\n')
+            # Cut short by an interruption
+            file.write('{"index": 1, "sta')
+        counts = DatasetRunner(workers=1).run(pairs, self.output)
+        self.assertEqual(counts, {'ok': 2})
+
+        outcomes = read_outcomes(self.output)
+        self.assertEqual(outcomes[0]['verdict'], 'recorded')
+        self.assertEqual(outcomes[1]['verdict'], EQUIVALENT_VERDICT)
+        self.assertEqual(outcomes[2]['verdict'], FIRST_STRONGER_VERDICT)
+        self.assertEqual(DatasetRunner(workers=1).run(pairs, self.output), {})
+        self.assertEqual(DatasetRunner(workers=1).run(pairs, self.output, resume=False), {'ok': 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
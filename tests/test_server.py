@@ -0,0 +1,86 @@
+import io
+import json
+import os
+import signal
+import socket
+import tempfile
+import threading
+import unittest
+from src.predi.comparator import Comparator
+from src.predi.server import ComparisonServer
+
+
+class CrashingComparator(Comparator):
+    """
+    Comparator that kills its process on predicates mentioning `crash`, as a Z3 segfault would.
+    """
+    def compare(self, predicate1, predicate2, timeout=None):
+        if 'crash' in predicate1:
+            os.kill(os.getpid(), signal.SIGKILL)
+        return super().compare(predicate1, predicate2, timeout)
+
+
+class TestComparisonServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ComparisonServer(workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+
+    def test_serve_stream(self):
+        requests = [
+            {'id': 1, 'p1': 'a > b', 'p2': 'a >= b'},
+            {'id': 'two', 'p1': 'a > b', 'p2': ' a>b'},
+            {'id': 3, 'p1': 'a $ b', 'p2': 'a > b'},
+            {'id': 4, 'p1': 'a > b'},
+        ]
+        reader = io.StringIO('\n'.join(json.dumps(request) for request in requests) + '\nnot json\n')
+        writer = io.StringIO()
+        self.assertEqual(self.server.serve_stream(reader, writer), 5)
+
+        responses = [json.loads(line) for line in writer.getvalue().splitlines()]
+        by_id = {response['id']: response for response in responses}
+        self.assertEqual(len(responses), 5)
+        self.assertEqual(by_id[1]['verdict'], 'The first predicate is stronger.')
+        self.assertEqual(by_id['two']['verdict'], 'The predicates are equivalent.')
+        self.assertTrue(by_id[3]['error'].startswith('ValueError'))
+        self.assertIn('`p2`', by_id[4]['error'])
+        self.assertTrue(by_id[None]['error'].startswith('Invalid JSON'))
+
+    def test_worker_crash(self):
+        # A crash fails the requests in flight on the broken pool, not every later one
+        with ComparisonServer(CrashingComparator(), workers=1) as server:
+            crashed = server.submit({'id': 1, 'p1': 'crash > 0', 'p2': 'crash >= 0'}).result()
+            self.assertTrue(crashed['error'].startswith('BrokenProcessPool'))
+            for index in range(2):
+                self.assertEqual(server.submit({'id': index, 'p1': 'a > b', 'p2': 'a >= b'}).result(),
+                                 {'id': index, 'verdict': 'The first predicate is stronger.', 'error': None})
+
+    def test_serve_unix(self):
+        path = os.path.join(tempfile.mkdtemp(), 'predi.sock')
+        thread = threading.Thread(target=self.server.serve_unix, args=(path,))
+        thread.start()
+        try:
+            while not os.path.exists(path):
+                thread.join(0.01)
+            clients = []
+            for index in range(2):
+                client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                client.connect(path)
+                client.sendall(json.dumps({'id': index, 'p1': 'a < b', 'p2': 'a <= b'}).encode() + b'\n')
+                client.shutdown(socket.SHUT_WR)
+                clients.append(client)
+            for index, client in enumerate(clients):
+                with client, client.makefile() as stream:
+                    self.assertEqual(json.loads(stream.readline()),
+                                     {'id': index, 'verdict': 'The first predicate is stronger.', 'error': None})
+        finally:
+            self.server.shutdown()
+            thread.join()
+        self.assertFalse(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
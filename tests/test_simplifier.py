@@ -2,6 +2,7 @@ import unittest
 from src.predi.tokenizer import Tokenizer
 from src.predi.parser import Parser, ASTNode
 from src.predi.simplifier import Simplifier
+from src.predi.comparator import Comparator
 
 class TestSimplifier(unittest.TestCase):
     def setUp(self):
@@ -45,6 +46,28 @@ class TestSimplifier(unittest.TestCase):
         ])
         self.assertASTEqual(simplified_ast, expected_ast)
 
+    def test_simplification_levels(self):
+        comparator = Comparator(simplification='none')
+
+        def expr(predicate, level):
+            return self.simplifier.simplify_expr(comparator.prepare(predicate).expr, level)
+
+        # Relations are moved to one orientation, with common factors divided out
+        self.assertEqual(expr("b > a", 'structural'), expr("a - b < 0", 'structural'))
+        self.assertEqual(expr("limiter + adminRate < now", 'structural'), expr("limiter < now - adminRate", 'structural'))
+        self.assertEqual(expr("2 * a > 4", 'structural'), expr("a > 2", 'none'))
+        self.assertEqual(str(expr("used == false", 'structural')), 'Eq(used, false)')
+        # The Boolean skeleton is only minimized at the `logic` level
+        self.assertEqual(expr("(a > b || c) && (a > b || !c)", 'logic'), expr("b < a", 'logic'))
+        self.assertNotEqual(expr("(a > b || c) && (a > b || !c)", 'structural'), expr("b < a", 'structural'))
+        self.assertEqual(expr("x >= y && y >= x", 'full'), expr("x == y", 'full'))
+        # Relations over the same operands share atoms, so complementary and covering ones meet
+        self.assertEqual(expr("a > 0 || a < 0", 'logic'), expr("a != 0", 'logic'))
+        self.assertEqual(expr("x >= y && y >= x", 'logic'), expr("x == y", 'logic'))
+        self.assertEqual(expr("a >= b && a != b && c", 'logic'), expr("c && b < a", 'logic'))
+        with self.assertRaises(ValueError):
+            expr("a > b", 'thorough')
+
 if __name__ == '__main__':
     pass
     #unittest.main()
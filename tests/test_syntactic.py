@@ -0,0 +1,57 @@
+import unittest
+from src.predi.parser import Parser
+from src.predi.syntactic import canonical, fingerprint, may_imply, serialize, signature
+from src.predi.tokenizer import Tokenizer
+
+
+class TestSyntactic(unittest.TestCase):
+    def setUp(self):
+        self.tokenizer = Tokenizer()
+
+    def parse(self, predicate):
+        return Parser(self.tokenizer.tokenize(predicate)).parse()
+
+    def signature(self, predicate):
+        return signature(self.parse(predicate))
+
+    def test_signatures(self):
+        sig = self.signature("!(a > b || c == d) && f(x)")
+        self.assertEqual(sig.symbols, {'a', 'b', 'c', 'd', 'f()', 'x'})
+        self.assertEqual(sig.kinds, {'ord', 'ne'})
+        self.assertEqual(self.signature("a > 3 || c > 1").required_symbols, set())
+        self.assertIsNone(self.signature("a > 3 && false").required_symbols)
+        self.assertFalse(may_imply(self.signature("a > 3"), self.signature("a > 3 && b > 0")))
+        self.assertFalse(may_imply(self.signature("a != b"), self.signature("a >= b")))
+        self.assertTrue(may_imply(self.signature("a > b"), self.signature("a != b")))
+        self.assertTrue(may_imply(self.signature("!used[salt]"), self.signature("used[salt] == false")))
+
+    def test_canonical(self):
+        equivalent = [
+            ("msg.sender == owner && a > b", "b < a && owner == msg.sender"),
+            ("(a && b) && c", "c && (b && a) && a"),
+            ("x * 2 + y >= z", "z <= y + 2 * x"),
+        ]
+        for predicate1, predicate2 in equivalent:
+            with self.subTest(predicate1=predicate1, predicate2=predicate2):
+                self.assertIs(canonical(self.parse(predicate1)), canonical(self.parse(predicate2)))
+        self.assertIsNot(canonical(self.parse("a - b > 0")), canonical(self.parse("b - a > 0")))
+
+    def test_fingerprint(self):
+        # Operands are ordered by their text, not by the per-process hash of the nodes
+        self.assertEqual(serialize(canonical(self.parse("c > 0 && b < a"))), "(&& (< 0 c) (< b a))")
+        self.assertEqual(fingerprint(self.parse("a > b && c")), fingerprint(self.parse("(c) && b < a")))
+        self.assertNotEqual(fingerprint(self.parse("a > b")), fingerprint(self.parse("a >= b")))
+
+    def test_deep_predicates(self):
+        # Chains nested deeper than the recursion limit are analyzed like any other predicate
+        terms = [f"x{i} > {i}" for i in range(1200)]
+        ast1, ast2 = self.parse(" && ".join(terms)), self.parse(" && ".join(reversed(terms)))
+        self.assertIs(canonical(ast1), canonical(ast2))
+        self.assertEqual(len(canonical(ast1).children), 1200)
+        self.assertTrue(serialize(ast1).startswith("(&& (&& "))
+        self.assertEqual(len(signature(ast1).required_symbols), 1200)
+        self.assertFalse(may_imply(signature(ast1), self.signature("y > 0")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -19,6 +19,23 @@ class TestTokenizer(unittest.TestCase):
         ]
         self.assertEqual(self.tokenizer.tokenize(predicate), expected_tokens)
 
+    def test_time_unit_and_scientific_predicate(self):
+        predicate = "now-1days<=x*1e18"
+        expected_tokens = [
+            ('now', 'IDENTIFIER'),
+            ('-', 'MINUS'),
+            ('86400', 'INTEGER'),
+            ('<=', 'LESS_EQUAL'),
+            ('x', 'IDENTIFIER'),
+            ('*', 'MULTIPLY'),
+            ('1000000000000000000', 'INTEGER')
+        ]
+        self.assertEqual(self.tokenizer.tokenize(predicate), expected_tokens)
+
+    def test_unexpected_character(self):
+        with self.assertRaises(ValueError):
+            self.tokenizer.tokenize("a $ b")
+
     # def test_complex_predicate(self):
     #     predicate = "(msg.sender != msg.origin && balance >= 100)"
     #     expected_tokens = [
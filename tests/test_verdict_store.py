@@ -0,0 +1,82 @@
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from multiprocessing import Pool
+from src.predi.comparator import Comparator, EQUIVALENT_VERDICT, FIRST_STRONGER_VERDICT, SECOND_STRONGER_VERDICT, Verdict
+from src.predi import verdict_store
+from src.predi.dedup import compare_deduplicated
+from src.predi.verdict_store import VerdictStore, comparison_version, pair_key
+
+
+def put_range(args):
+    store, start = args
+    return store.put_many((pair_key(str(key), 'x'), Verdict.EQUIVALENT) for key in range(start, start + 100))
+
+
+class TestVerdictStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'verdicts.sqlite')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_versions(self):
+        self.assertNotEqual(comparison_version(Comparator()), comparison_version(Comparator(timeout=5)))
+        self.assertEqual(comparison_version(Comparator(timeout=5)), comparison_version(Comparator(timeout=5.0)))
+        self.assertNotEqual(comparison_version(Comparator()), comparison_version(Comparator(simplification='full')))
+
+        with VerdictStore(self.path, 'old') as store:
+            self.assertEqual(store.put_many([('a', Verdict.EQUIVALENT), ('b', Verdict.TIMEOUT), ('c', Verdict.ERROR)]), 1)
+        with VerdictStore(self.path, 'new') as store:
+            self.assertEqual(store.get_many(['a', 'b']), {})
+            store.put_many([('a', Verdict.FIRST_STRONGER)])
+            self.assertEqual(store.get('a'), Verdict.FIRST_STRONGER)
+            self.assertEqual(store.versions(), {'old': 1, 'new': 1})
+            self.assertEqual(store.prune(), 1)
+            self.assertEqual(store.versions(), {'new': 1})
+            self.assertEqual((store.hits, store.misses), (1, 2))
+
+    def test_concurrent_writes(self):
+        store = VerdictStore(self.path, 'v')
+        with Pool(4) as pool:
+            self.assertEqual(pool.map(put_range, [(store, start) for start in range(0, 800, 100)]), [100] * 8)
+        keys = [pair_key(str(key), 'x') for key in range(800)]
+        self.assertEqual(len(store.get_many(keys)), 800)
+        store.close()
+
+    def test_compare_stored(self):
+        pairs = [("a > b", "a >= b"), ("b <= a", "b < a"), ("a > b", "b < a"), ("a $ b", "a")]
+        comparator = Comparator()
+        with VerdictStore(self.path, comparison_version(comparator)) as store:
+            first = list(compare_deduplicated(pairs, comparator, workers=1, store=store))
+            self.assertEqual((store.hits, store.misses), (0, 3))
+        with VerdictStore(self.path, comparison_version(comparator)) as store:
+            second = list(compare_deduplicated(pairs, comparator, workers=1, store=store))
+            # The pair that failed is compared again
+            self.assertEqual((store.hits, store.misses), (2, 1))
+        for results in (first, second):
+            self.assertEqual([result.verdict for result in results],
+                             [FIRST_STRONGER_VERDICT, SECOND_STRONGER_VERDICT, EQUIVALENT_VERDICT, None])
+            self.assertEqual([(result.predicate1, result.predicate2) for result in results], pairs)
+        self.assertIsNone(second[0].counterexamples)
+        self.assertTrue(second[3].error.startswith('ValueError'))
+
+    def test_prune(self):
+        # The current version is that of the options of the run, not of a default comparator
+        version = comparison_version(verdict_store.Comparator(timeout=5, simplification='full'))
+        for stored in ('old', version):
+            with VerdictStore(self.path, stored) as store:
+                store.put_many([('a', Verdict.EQUIVALENT)])
+        with redirect_stdout(io.StringIO()) as output:
+            verdict_store.main([self.path, '--timeout', '5', '--simplification', 'full', '--prune'])
+        self.assertEqual(output.getvalue(), f"Deleted: 1\n{version} (current): 1\n")
+        with redirect_stdout(io.StringIO()) as output:
+            verdict_store.main([self.path, '--version', version, '--prune'])
+        self.assertEqual(output.getvalue(), f"Deleted: 0\n{version} (current): 1\n")
+
+
+if __name__ == '__main__':
+    unittest.main()